@@ -1,7 +1,7 @@
 from .program_management import render_program_management
 from .sidebar import render_sidebar
 from .dashboard import render_project_dashboard
-from .chat import render_chat_interface_sync as render_chat_interface
+from .chat import render_chat_interface
 from .settings import render_settings
 from .eligibility_criteria import render_eligibility_results
 from .report_questions import render_reports
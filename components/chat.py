@@ -1,9 +1,9 @@
-import asyncio
 import streamlit as st
 from datetime import datetime
-from grant_rag import GrantAssessmentSystem
+from grant_rag import GrantAssessmentSystem, log
+from utils import run_async, iterate_async
 
-async def render_chat_interface():
+def render_chat_interface():
     """Render enhanced chat interface for asking questions about projects"""
     st.markdown("<h2 class='sub-header'>Project Chat Interface</h2>", unsafe_allow_html=True)
     # Initialize session state if missing
@@ -66,11 +66,11 @@ async def render_chat_interface():
     with input_area:
         user_input = st.chat_input("Type your message here...")
         if user_input:
-            await handle_user_input(user_input, chat_mode)
+            handle_user_input(user_input, chat_mode)
             st.rerun()
     
 
-async def handle_user_input(user_input, chat_mode):
+def handle_user_input(user_input, chat_mode):
     """Handle user input for chat interaction."""
     try:
         if chat_mode == "Single Project" and st.session_state.get("chat_project"):
@@ -78,14 +78,14 @@ async def handle_user_input(user_input, chat_mode):
             st.session_state.messages.append({"role": "user", "content": user_input, "project": chat_project, "timestamp": datetime.now().isoformat()})
             with st.spinner("Getting response..."):
                 
-                response = await st.session_state.grant_system.ask_project(chat_project, user_input)
+                response = run_async(st.session_state.grant_system.ask_project(chat_project, user_input))
                 # response = {
                 #     "answer": "answer",
                 #     "sources": "sources",
                 #     "timestamp": datetime.now().isoformat(),
                 #     "context_used": len("context_chunks")
                 # }
-                print("[info] response from ", chat_project, " is ", response)
+                log.debug("response from %s is %s", chat_project, response)
             st.session_state.messages.append({
                 "role": "assistant",
                 "content": response.get("answer", "No response") + "\n\n" + response.get("chunks") + "\n",
@@ -97,20 +97,31 @@ async def handle_user_input(user_input, chat_mode):
         elif chat_mode == "Multi-Project Comparison" and len(st.session_state.get("comparison_projects", [])) >= 2:
             st.session_state.messages.append({"role": "user", "content": user_input, "comparison": True, "timestamp": datetime.now().isoformat()})
 
-            with st.spinner("Generating comparison..."):
-                results = await st.session_state.grant_system.chat_with_projects(user_input, st.session_state.comparison_projects)
+            grant_system = st.session_state.grant_system
+            with st.spinner("Querying projects..."):
+                responses = run_async(
+                    grant_system.collect_project_responses(user_input, st.session_state.comparison_projects)
+                )
+
+            # Stream the comparison into the chat as tokens arrive
+            comparison = ""
+            with st.chat_message("assistant"):
+                placeholder = st.empty()
+                try:
+                    for piece in iterate_async(grant_system.stream_comparison(user_input, responses)):
+                        comparison += piece
+                        placeholder.markdown(comparison + "▌")
+                except Exception as e:
+                    comparison = f"Error generating comparative analysis: {str(e)}"
+                placeholder.markdown(comparison)
 
             st.session_state.messages.append({
                 "role": "assistant",
-                "comparison": True,
-                "responses": results["responses"],
-                "comparison": results["comparison"],
+                "content": comparison,
+                "responses": responses,
+                "comparison": comparison,
                 "timestamp": datetime.now().isoformat()
             })
 
     except Exception as e:
         st.error(f"Error processing message: {str(e)}")
-
-def render_chat_interface_sync():
-    """Run the async chat interface inside Streamlit."""
-    asyncio.run(render_chat_interface())
@@ -62,6 +62,7 @@ def render_project_dashboard():
                 metrics = st.session_state.processing_metrics.get(project, {})
                 st.markdown(f"**Documents:** {metrics.get('Documents Processed', 0)}")
                 st.markdown(f"**Chunks:** {metrics.get('Chunks Stored', 0)}")
+                st.markdown(f"**Embedding Cache Hits:** {metrics.get('Embedding Cache Hits', 0)}")
             
             with col2:
                 # Processing times
@@ -2,16 +2,16 @@ import streamlit as st
 import pandas as pd
 from typing import Dict, Any
 from config.constants import GRANT_PROGRAMS
+from grant_rag import log
 
 def render_selected_projects():
     """Render selected projects in the main area"""
-    print(f"[debug] st.session_state.selection_results {st.session_state.selection_results}")
+    log.debug("st.session_state.selection_results %s", st.session_state.selection_results)
     if st.session_state.selection_results:
         st.markdown("<h2 class='sub-header'>Selected Projects</h2>", unsafe_allow_html=True)
 
         # Create summary table
         summary_data = []
-        print(f"[debug] -> st.session_state.selection_results -> {st.session_state.selection_results}")
         for project_name, result in st.session_state.selection_results.items():
             summary_data.append({
                 "Project": project_name,
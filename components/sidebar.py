@@ -3,96 +3,128 @@ import os
 import asyncio
 from datetime import datetime
 from config.constants import GRANT_PROGRAMS
-from utils import save_session_state
+from utils import save_session_state, apply_queued_metrics, run_async, iterate_async
+from grant_rag import gather_limited
 from typing import Dict, Any
 import time
 
-async def check_eligibility(project_names, criteria):
+async def ingest_projects(grant_system, project_names):
+    """Ingest projects concurrently, yielding (project name, success) as each one finishes"""
+    semaphore = asyncio.Semaphore(grant_system.project_ingest_concurrency)
+
+    async def ingest(project_name):
+        async with semaphore:
+            return project_name, await grant_system.ingest_project(project_name)
+
+    for next_done in asyncio.as_completed([ingest(name) for name in project_names]):
+        yield await next_done
+
+def check_eligibility(project_names, criteria):
     """Check eligibility for selected projects"""
     with st.spinner("Checking eligibility..."):
-        results = {}
-        for project_name in project_names:
-            if project_name in st.session_state.grant_system.projects:
-                result = await st.session_state.grant_system.projects[project_name].check_eligibility(criteria)
-                results[project_name] = result
+        grant_system = st.session_state.grant_system
+        project_names = [name for name in project_names if name in grant_system.projects]
+        
+        async def check(project_name):
+            # Opening a project blocks, so it happens on a worker thread rather than the loop
+            project = await grant_system.projects.open(project_name)
+            return await project.check_eligibility(criteria)
+        
+        # Check all selected projects concurrently
+        outcomes = run_async(gather_limited((check(name) for name in project_names), grant_system.llm_concurrency))
+        results = dict(zip(project_names, outcomes))
         st.session_state.eligibility_results = results
         return results
 
-async def check_selection(project_names, criteria):
+def check_selection(project_names, criteria):
     """Check selected projects"""
     with st.spinner("Selecting projects that meet the criteria..."):
-        results = {}
-        for project_name in project_names:
-            if project_name in st.session_state.grant_system.projects:
-                result = await st.session_state.grant_system.projects[project_name].check_selected_projects(criteria)
-                results[project_name] = result
+        grant_system = st.session_state.grant_system
+        project_names = [name for name in project_names if name in grant_system.projects]
+        
+        async def select(project_name):
+            project = await grant_system.projects.open(project_name)
+            return await project.check_selected_projects(criteria)
+        
+        outcomes = run_async(gather_limited((select(name) for name in project_names), grant_system.llm_concurrency))
+        results = dict(zip(project_names, outcomes))
         st.session_state.selection_results = results
         return results
     
-async def generate_reports(project_names, questions):
+def generate_reports(project_names, questions):
     """Generate detailed reports for selected projects"""
     with st.spinner("Generating detailed reports..."):
-        results = {}
-        for project_name in project_names:
-            if project_name in st.session_state.grant_system.projects:
-                report = await st.session_state.grant_system.projects[project_name].generate_detailed_report(questions)
-                results[project_name] = report
+        grant_system = st.session_state.grant_system
+        project_names = [name for name in project_names if name in grant_system.projects]
+        
+        async def report(project_name):
+            project = await grant_system.projects.open(project_name)
+            return await project.generate_detailed_report(questions)
+        
+        outcomes = run_async(gather_limited((report(name) for name in project_names), grant_system.llm_concurrency))
+        results = dict(zip(project_names, outcomes))
         st.session_state.reports = results
         return results
 
-async def generate_recommendations(project_names):
+def generate_recommendations(project_names):
     """Generate recommendations for selected projects"""
     with st.spinner("Generating recommendations..."):
-        results = {}
+        grant_system = st.session_state.grant_system
         program = st.session_state.selected_program
         criteria = GRANT_PROGRAMS[program]["eligibility_criteria"]
         questions = GRANT_PROGRAMS[program]["report_questions"]
+        eligibility_results = st.session_state.eligibility_results
+        reports = st.session_state.reports
         
-        for project_name in project_names:
-            if project_name in st.session_state.grant_system.projects:
-                # Check if we already have eligibility results
-                if project_name in st.session_state.eligibility_results:
-                    eligibility = st.session_state.eligibility_results[project_name]
-                else:
-                    eligibility = await st.session_state.grant_system.projects[project_name].check_eligibility(criteria)
-                
-                # Check if we already have report
-                if project_name in st.session_state.reports:
-                    report = st.session_state.reports[project_name]
-                else:
-                    report = await st.session_state.grant_system.projects[project_name].generate_detailed_report(questions)
-                
-                # Generate recommendation
-                recommendation = await st.session_state.grant_system.projects[project_name].generate_recommendation(
-                    eligibility, report
+        async def recommend(project_name):
+            project = await grant_system.projects.open(project_name)
+            # Reuse existing eligibility results and reports; compute missing ones together
+            eligibility = eligibility_results.get(project_name)
+            report = reports.get(project_name)
+            if eligibility is None and report is None:
+                eligibility, report = await asyncio.gather(
+                    project.check_eligibility(criteria),
+                    project.generate_detailed_report(questions)
                 )
-                results[project_name] = recommendation
+            elif eligibility is None:
+                eligibility = await project.check_eligibility(criteria)
+            elif report is None:
+                report = await project.generate_detailed_report(questions)
+            
+            # Generate recommendation
+            return await project.generate_recommendation(eligibility, report)
+        
+        # Each project goes from its inputs to its recommendation independently
+        project_names = [name for name in project_names if name in grant_system.projects]
+        outcomes = run_async(gather_limited((recommend(name) for name in project_names), grant_system.llm_concurrency))
+        results = dict(zip(project_names, outcomes))
         
         st.session_state.recommendations = results
         return results
 
-async def generate_comparative(eligible_only=True):
+def generate_comparative(eligible_only=True):
     """Generate comparative analysis of selected projects"""
     with st.spinner("Generating comparative analysis..."):
         try:
             # Filter to only selected projects
-            original_projects = st.session_state.grant_system.projects.copy()
-            filtered_projects = {p: original_projects[p] for p in st.session_state.selected_projects if p in original_projects}
+            original_projects = st.session_state.grant_system.projects
+            project_names = [p for p in st.session_state.selected_projects if p in original_projects]
             
             # If eligible_only is True, filter to only eligible projects
             if eligible_only:
-                eligible_projects = {}
-                for project_name, project in filtered_projects.items():
-                    if project_name in st.session_state.eligibility_results:
-                        if st.session_state.eligibility_results[project_name]["eligible"]:
-                            eligible_projects[project_name] = project
-                filtered_projects = eligible_projects
+                eligibility_results = st.session_state.eligibility_results
+                project_names = [
+                    p for p in project_names
+                    if p in eligibility_results and eligibility_results[p]["eligible"]
+                ]
             
-            # Temporarily update the grant system's projects
-            st.session_state.grant_system.projects = filtered_projects
+            # Open the projects in the full registry (on worker threads) so the subset shares them,
+            # then temporarily update the grant system's projects
+            run_async(original_projects.open_many(project_names))
+            st.session_state.grant_system.projects = original_projects.subset(project_names)
             
             # Generate analysis
-            analysis = await st.session_state.grant_system.generate_comparative_analysis(eligible_only)
+            analysis = run_async(st.session_state.grant_system.generate_comparative_analysis(eligible_only))
             
             # Restore original projects
             st.session_state.grant_system.projects = original_projects
@@ -108,6 +140,11 @@ async def generate_comparative(eligible_only=True):
                 "timestamp": datetime.now().isoformat()
             }
 
+@st.cache_data(show_spinner=False)
+def list_project_folders(projects_data_path, mtime_ns):
+    """List project folders; cached until a folder is added or removed (which changes the directory's mtime)"""
+    return [entry.name for entry in os.scandir(projects_data_path) if entry.is_dir()]
+
 def render_sidebar():
     """Render the sidebar with project selection and actions"""
     st.sidebar.title("Grant RAG System")
@@ -132,8 +169,7 @@ def render_sidebar():
     available_projects = []
     
     if os.path.exists(projects_data_path):
-        available_projects = [d for d in os.listdir(projects_data_path) 
-                            if os.path.isdir(os.path.join(projects_data_path, d))]
+        available_projects = list_project_folders(projects_data_path, os.stat(projects_data_path).st_mtime_ns)
     
     if not available_projects:
         st.sidebar.warning("No projects found in projects_data directory")
@@ -158,11 +194,7 @@ def render_sidebar():
                 progress_bar = st.sidebar.progress(0)
                 status_text = st.sidebar.empty()
                 
-                for idx, project in enumerate(selected_projects, 1):
-                    status_text.text(f"Ingesting {project}...")
-                    progress = idx / len(selected_projects)
-                    progress_bar.progress(progress)
-                    
+                for project in selected_projects:
                     # Initialize metrics for the project
                     if project not in st.session_state.processing_metrics:
                         st.session_state.processing_metrics[project] = {
@@ -174,10 +206,13 @@ def render_sidebar():
                     
                     if project not in st.session_state.operation_timestamps:
                         st.session_state.operation_timestamps[project] = {}
-                    
-                    # Perform ingestion
-                    start_time = time.time()
-                    success = asyncio.run(st.session_state.grant_system.ingest_project(project))
+                
+                # Ingest the projects concurrently, advancing the progress as each one finishes
+                status_text.text(f"Ingesting {len(selected_projects)} projects...")
+                completions = ingest_projects(st.session_state.grant_system, selected_projects)
+                for idx, (project, success) in enumerate(iterate_async(completions), 1):
+                    status_text.text(f"Ingested {project}")
+                    progress_bar.progress(idx / len(selected_projects))
                     
                     if success:
                         st.session_state.ingested_projects.add(project)
@@ -188,6 +223,7 @@ def render_sidebar():
                 st.session_state.is_processing = False
                 st.session_state.current_operation = None
                 st.sidebar.success(f"Ingested {len(selected_projects)} projects")
+                apply_queued_metrics()
                 
                 # Save session state and trigger rerun
                 save_session_state()
@@ -216,7 +252,7 @@ def render_sidebar():
             st.session_state.is_processing = True
             st.session_state.current_operation = "Checking Eligibility"
             criteria = GRANT_PROGRAMS[st.session_state.selected_program]["eligibility_criteria"]
-            results = asyncio.run(check_eligibility(st.session_state.selected_projects, criteria))
+            results = check_eligibility(st.session_state.selected_projects, criteria)
             st.session_state.is_processing = False
             st.session_state.current_operation = None
             if results:
@@ -229,7 +265,7 @@ def render_sidebar():
             st.session_state.is_processing = True
             st.session_state.current_operation = "Selecting Projects"
             criteria = GRANT_PROGRAMS[st.session_state.selected_program]["selection_criteria"]
-            results = asyncio.run(check_selection(st.session_state.selected_projects, criteria))
+            results = check_selection(st.session_state.selected_projects, criteria)
             st.session_state.is_processing = False
             st.session_state.current_operation = None
             if results:
@@ -242,7 +278,7 @@ def render_sidebar():
             st.session_state.is_processing = True
             st.session_state.current_operation = "Generating Reports"
             questions = GRANT_PROGRAMS[st.session_state.selected_program]["report_questions"]
-            results = asyncio.run(generate_reports(st.session_state.selected_projects, questions))
+            results = generate_reports(st.session_state.selected_projects, questions)
             st.session_state.is_processing = False
             st.session_state.current_operation = None
             if results:
@@ -253,7 +289,7 @@ def render_sidebar():
         if st.sidebar.button("Generate Recommendations", use_container_width=True):
             st.session_state.is_processing = True
             st.session_state.current_operation = "Generating Recommendations"
-            results = asyncio.run(generate_recommendations(st.session_state.selected_projects))
+            results = generate_recommendations(st.session_state.selected_projects)
             st.session_state.is_processing = False
             st.session_state.current_operation = None
             if results:
@@ -265,7 +301,7 @@ def render_sidebar():
             if st.sidebar.button("Comparative Analysis", use_container_width=True):
                 st.session_state.is_processing = True
                 st.session_state.current_operation = "Generating Comparative Analysis"
-                analysis = asyncio.run(generate_comparative())
+                analysis = generate_comparative()
                 st.session_state.is_processing = False
                 st.session_state.current_operation = None
                 if analysis:
@@ -294,43 +330,31 @@ def render_sidebar():
         if uploaded_files:
             for uploaded_file in uploaded_files:
                 try:
-                    # Create temporary directory for the zip file
-                    import tempfile
-                    import shutil
-                    import zipfile
-                    
-                    with tempfile.TemporaryDirectory() as temp_dir:
-                        # Save zip file
-                        zip_path = os.path.join(temp_dir, uploaded_file.name)
-                        with open(zip_path, "wb") as f:
-                            f.write(uploaded_file.getbuffer())
-                        
-                        # Extract zip
-                        project_name = os.path.splitext(uploaded_file.name)[0]
-                        extract_path = os.path.join(temp_dir, project_name)
-                        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                            zip_ref.extractall(extract_path)
-                        
-                        # Add project using existing function
-                        success = asyncio.run(st.session_state.grant_system.add_project_folder(extract_path))
-                        if success:
-                            st.sidebar.success(f"Successfully imported project: {project_name}")
-                            # Update session state
-                            if project_name not in st.session_state.projects_info:
-                                st.session_state.projects_info[project_name] = {
-                                    "name": project_name,
-                                    "path": os.path.join(st.session_state.grant_system.projects_dir, project_name),
-                                    "file_count": sum([len(files) for _, _, files in os.walk(extract_path)]),
-                                    "last_modified": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                }
-                        else:
-                            st.sidebar.error(f"Failed to import project: {project_name}")
+                    # Extract straight from the upload into the projects directory;
+                    # ZipFile reads any seekable file-like, so nothing is staged on disk first
+                    project_name = os.path.splitext(uploaded_file.name)[0]
+                    success = run_async(
+                        st.session_state.grant_system.add_project_archive(uploaded_file, project_name)
+                    )
+                    if success:
+                        st.sidebar.success(f"Successfully imported project: {project_name}")
+                        # Update session state
+                        project_path = os.path.join(st.session_state.grant_system.projects_dir, project_name)
+                        if project_name not in st.session_state.projects_info:
+                            st.session_state.projects_info[project_name] = {
+                                "name": project_name,
+                                "path": project_path,
+                                "file_count": st.session_state.grant_system.file_counts[project_name],
+                                "last_modified": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                            }
+                    else:
+                        st.sidebar.error(f"Failed to import project: {project_name}")
                 except Exception as e:
                     st.sidebar.error(f"Error processing zip file: {str(e)}")
         
         if folder_path and os.path.exists(folder_path):
             try:
-                success = asyncio.run(st.session_state.grant_system.add_project_folder(folder_path))
+                success = run_async(st.session_state.grant_system.add_project_folder(folder_path))
                 if success:
                     project_name = os.path.basename(folder_path)
                     st.sidebar.success(f"Successfully imported project: {project_name}")
@@ -339,7 +363,7 @@ def render_sidebar():
                         st.session_state.projects_info[project_name] = {
                             "name": project_name,
                             "path": os.path.join(st.session_state.grant_system.projects_dir, project_name),
-                            "file_count": sum([len(files) for _, _, files in os.walk(folder_path)]),
+                            "file_count": st.session_state.grant_system.file_counts[project_name],
                             "last_modified": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                         }
                 else:
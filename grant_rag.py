@@ -1,35 +1,201 @@
 import asyncio
+import base64
+import contextlib
 import os
-import json
 import re
 import hashlib
+import io
+import struct
+import shutil
+import sqlite3
 import time
-from typing import List, Dict, Optional, Any, Tuple
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+import threading
+import zipfile
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Tuple, AsyncIterator, BinaryIO, Callable, Iterable, Iterator, Set
 from datetime import datetime
 from pathlib import Path
 
-# Document processing
-from pypdf import PdfReader
-from openpyxl import load_workbook
-import docx
+# Document processing libraries (pymupdf, pypdfium2, pypdf, openpyxl, lxml) are imported
+# lazily by the extractors, so query-only callers don't pay for them
 from dotenv import load_dotenv
 
 # Database and embeddings
 import chromadb
-from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
 
 # Caching
-from diskcache import Cache as PersistentCache
+from diskcache import FanoutCache
+import numpy as np
+import orjson
+try:
+    import xxhash  # Optional: much faster non-cryptographic cache keys
+except ImportError:
+    xxhash = None
 
 # LLM
 import openai
-from openai import OpenAI
-import streamlit as st
+import httpx
+from openai import AsyncOpenAI
+import tiktoken
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+from config.constants import GRANT_PROGRAMS
+
 # Constants
 DEBUG = False
 DEFAULT_LLM_MODEL = "gpt-4o"  # Default model
-CHUNK_SIZE = 1000  # Characters per chunk
-CHUNK_OVERLAP = 200  # Overlap between chunks
+CHUNK_TOKENS = 500  # Target tokens per chunk
+CHUNK_OVERLAP_TOKENS = 50  # Tokens of trailing sentences repeated at the start of the next chunk
+SIMHASH_SHINGLE_SIZE = 3  # Words per shingle when fingerprinting chunks
+SIMHASH_MAX_DISTANCE = 3  # Max differing bits for two chunks to count as near-duplicates
+DEFAULT_LLM_CONCURRENCY = 5  # Max concurrent LLM requests per fan-out
+DEFAULT_INGEST_CONCURRENCY = 10  # Max files of one project ingested at once
+DEFAULT_PROJECT_INGEST_CONCURRENCY = 2  # Max projects ingested at once, each with its own file limit
+DEFAULT_GRANT_PROGRAM = "Oxfam"  # Program whose criteria the CLI pipeline assesses against
+EMBEDDING_MODEL = "text-embedding-3-small"  # Used for both stored chunks and queries
+EMBEDDING_DIMENSIONS = 512  # Shortened output size; a third of the full 1536 with little recall loss
+EMBED_BATCH_SIZE = 512  # Max texts collected into one embeddings request (API allows 2048)
+EMBED_BATCH_WINDOW = 0.1  # Seconds to wait for more texts before sending a batch
+EMBED_MAX_TOKENS_PER_REQUEST = 250000  # Stay under the provider's per-request token limit
+EMBED_MAX_CONCURRENT_REQUESTS = 4  # Embedding requests in flight while the next batch is collected
+HNSW_BATCH_SIZE = 1000  # Vectors buffered (brute-force searched) before being added to the HNSW index
+HNSW_SYNC_THRESHOLD = 10000  # Vectors added before the HNSW index is persisted to disk
+HNSW_SPACE = "cosine"  # Distance function; embeddings are unit-normalized
+HNSW_M = 24  # Graph neighbours per node (Chroma default 16); better recall on large projects
+HNSW_CONSTRUCTION_EF = 128  # Candidate list size while building the graph (default 100)
+HNSW_SEARCH_EF = 100  # Candidate list size per query
+CHROMA_WRITE_BATCH = 256  # Chunks buffered across documents before each collection write
+QUERY_CACHE_TTL = 3600  # Seconds cached retrievals and responses stay valid
+QUERY_CACHE_MEMORY_SIZE = 512  # Entries kept in memory in front of each disk cache
+QUERY_CACHE_DIR = "./cache"  # Disk cache shared by all projects' retrieval and response caches
+QUERY_CACHE_SHARDS = 8  # SQLite shards, so concurrent writers rarely contend
+QUERY_CACHE_SIZE_LIMIT = 2 * 1024 ** 3  # Bytes on disk before the oldest entries are evicted
+SEMANTIC_CACHE_THRESHOLD = 0.95  # Min cosine similarity for a query to reuse an earlier answer
+SEMANTIC_CACHE_SIZE = 256  # Answers per project kept for similarity lookups
+SEARCH_CACHE_THRESHOLD = 0.97  # Min cosine similarity for a global search to reuse earlier results
+EMBEDDING_CACHE_PATH = "./embedding_cache.db"  # SQLite file for the persistent embedding cache
+EMBEDDING_CACHE_DTYPE = "int8"  # Storage format for cached vectors: int8, float16 or float32
+EMBEDDING_CACHE_TTL = 90 * 24 * 3600  # Seconds a cached vector is kept before it is evicted
+LLM_RETRY_ATTEMPTS = 5  # Attempts per OpenAI call before giving up
+LLM_RETRY_MAX_WAIT = 30  # Cap in seconds for a single backoff sleep
+HTTP_MAX_CONNECTIONS = 100  # Connection pool size shared by all OpenAI clients
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 50  # Idle connections kept open for reuse
+HTTP_TIMEOUT = 60.0  # Seconds per OpenAI request
+HTTP_CONNECT_TIMEOUT = 10.0  # Seconds to establish a connection
+COPY_THREAD_THRESHOLD = 1000  # Copy trees with more files than this on a thread pool
+SUPPORTED_EXTENSIONS = [".pdf", ".docx", ".doc", ".xlsx", ".xls", ".txt"]
+EXCEL_MAX_ROWS = 1000  # Limit number of rows read per sheet to prevent hanging
+
+# Fixed prompt prefixes are kept byte-identical across calls so the provider's
+# automatic prompt caching can reuse them (OpenAI caches prefixes of 1024+ tokens)
+RESPONSE_SYSTEM_PROMPT = (
+    "You are an AI assistant specialized in analyzing grant applications and project documents. "
+    "You will be provided with context chunks from a project's documents. "
+    "Use this information to answer the query accurately and concisely. "
+    "If the information is not in the context, state that clearly. "
+    "Include specific facts, figures, and quotes from the documents when relevant. "
+    "Always cite your sources when quoting from specific documents."
+)
+RECOMMENDATION_SYSTEM_PROMPT = (
+    "You are a grant evaluation expert assisting a donor in making funding decisions. "
+    "Your role is to provide an objective recommendation based on project eligibility and "
+    "detailed assessment, highlighting strengths, weaknesses, risks, and potential impact. "
+    "Your recommendation should be clear, substantiated with evidence from the project documents, "
+    "and include specific funding suggestions or alternatives if appropriate. "
+    "You MUST start your response with one of these exact phrases on the first line:\n"
+    "DECISION: Fund\n"
+    "DECISION: Do Not Fund\n"
+    "DECISION: Partially Fund\n"
+)
+RECOMMENDATION_PROMPT_PREFIX = (
+    "Based on the following project assessment, provide a donor recommendation that includes:\n"
+    "1. Funding decision (Must start with DECISION: followed by Fund/Do Not Fund/Partially Fund)\n"
+    "2. Executive summary (2-3 sentences)\n"
+    "3. Key strengths and weaknesses\n"
+    "4. Risks and mitigations\n"
+    "5. Expected impact if funded\n"
+    "6. Any conditions or special considerations\n\n"
+)
+
+# Prompt templates for multi-project comparisons
+COMPARISON_SYSTEM_PROMPT = (
+    "You are an expert grant analyst tasked with comparing responses from multiple projects. "
+    "Provide clear, insightful analysis that helps understand the relationships and differences between projects."
+)
+COMPARISON_PROMPT_TEMPLATE = """Based on the responses from multiple projects to the question "{query}", please provide a comparative analysis.
+Focus on:
+1. Key similarities and differences in the responses
+2. Notable insights unique to each project
+3. Overall patterns or trends
+4. Implications of these differences
+
+Context:
+Question asked: {query}
+
+Project responses:
+{context}
+
+Please provide a clear, structured analysis that helps understand how the projects relate to each other in the context of this question."""
+PROJECT_SUMMARY_QUERY = (
+    "Summarize this project's key aspects including: "
+    "1. Main objectives and goals "
+    "2. Target beneficiaries "
+    "3. Implementation approach "
+    "4. Expected outcomes and impact "
+    "5. Budget and resource requirements"
+)
+ANALYSIS_SYSTEM_PROMPT = (
+    "You are an expert grant analyst tasked with comparing multiple projects. "
+    "Provide a detailed comparative analysis focusing on strengths, weaknesses, "
+    "synergies, and potential impact. Be objective and support your analysis "
+    "with specific examples from the projects."
+)
+ANALYSIS_PROMPT_TEMPLATE = (
+    "Compare the following projects, analyzing their relative merits, "
+    "potential impact, and areas of complementarity or overlap:\n\n"
+    "{context}\n\n"
+    "Please structure your analysis to cover:\n"
+    "1. Key similarities and differences\n"
+    "2. Relative strengths and weaknesses\n"
+    "3. Potential synergies or overlaps\n"
+    "4. Comparative impact assessment\n"
+    "5. Resource efficiency comparison\n"
+    "6. Recommendations for optimization"
+)
+
+# Larger copy buffer for the non-sendfile copy paths
+shutil.COPY_BUFSIZE = 1024 * 1024
+
+log = logging.getLogger("grant_rag")
+
+def setup_logging(level: Optional[str] = None) -> logging.handlers.QueueListener:
+    """
+    Route log records through a queue so callers never block on formatting or stream I/O
+    
+    Args:
+        level: Log level name; defaults to the LOG_LEVEL environment variable,
+            else DEBUG or INFO according to the DEBUG flag
+    
+    Returns:
+        The started QueueListener; call stop() on shutdown to flush pending records
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel((level or os.getenv("LOG_LEVEL") or ("DEBUG" if DEBUG else "INFO")).upper())
+    listener.start()
+    return listener
 
 # =================== LOAD ENVIRONMENT VARIABLES ===================
 load_dotenv()
@@ -37,6 +203,12 @@ openai_key = os.getenv("OPENAI_API_KEY")
 if not openai_key:
     raise ValueError("Please set your OPENAI_API_KEY in the environment variables.")
 
+# Patterns used by sanitize_name
+INVALID_NAME_CHARS = re.compile(r'[^a-zA-Z0-9-]+')
+LEADING_NON_ALNUM = re.compile(r'^[^a-zA-Z0-9]+')
+TRAILING_NON_ALNUM = re.compile(r'[^a-zA-Z0-9]+$')
+
+@lru_cache(maxsize=4096)
 def sanitize_name(name: str) -> str:
     """
     Sanitize a name to be used as a ChromaDB collection name.
@@ -47,13 +219,11 @@ def sanitize_name(name: str) -> str:
     4. No consecutive periods
     5. Not a valid IPv4 address
     """
-    # Replace spaces and other invalid characters with underscores
-    sanitized = re.sub(r'[^a-zA-Z0-9-]', '_', name)
-    # Remove consecutive underscores
-    sanitized = re.sub(r'_+', '_', sanitized)
+    # Replace each run of spaces and other invalid characters with one underscore
+    sanitized = INVALID_NAME_CHARS.sub('_', name)
     # Ensure it starts and ends with alphanumeric
-    sanitized = re.sub(r'^[^a-zA-Z0-9]+', '', sanitized)
-    sanitized = re.sub(r'[^a-zA-Z0-9]+$', '', sanitized)
+    sanitized = LEADING_NON_ALNUM.sub('', sanitized)
+    sanitized = TRAILING_NON_ALNUM.sub('', sanitized)
     
     # If name is too short, pad it
     if len(sanitized) < 3:
@@ -62,25 +232,925 @@ def sanitize_name(name: str) -> str:
     if len(sanitized) > 63:
         sanitized = sanitized[:63]
         # Ensure it ends with alphanumeric
-        sanitized = re.sub(r'[^a-zA-Z0-9]+$', '', sanitized)
+        sanitized = TRAILING_NON_ALNUM.sub('', sanitized)
     
     return sanitized
 
+@lru_cache(maxsize=1)
+def get_token_encoding():
+    """Load the tiktoken encoding once per process"""
+    return tiktoken.get_encoding("cl100k_base")
+
+def _http_client_options() -> Dict[str, Any]:
+    return {
+        "http2": True,
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        "timeout": httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+    }
+
+@lru_cache(maxsize=1)
+def get_async_http_client() -> httpx.AsyncClient:
+    """Shared HTTP/2 connection pool for the OpenAI clients"""
+    return httpx.AsyncClient(**_http_client_options())
+
+@lru_cache(maxsize=1)
+def get_cpu_pool() -> ProcessPoolExecutor:
+    """Process pool for document parsing, shared by every grant system in the process"""
+    # The app process runs several threads (event loop, log listener, state writer),
+    # which forking would copy mid-flight; workers start from a clean interpreter instead
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=context)
+
+async def shutdown():
+    """Close the shared HTTP client and process pool"""
+    if get_async_http_client.cache_info().currsize:
+        await get_async_http_client().aclose()
+        get_async_http_client.cache_clear()
+    if get_cpu_pool.cache_info().currsize:
+        get_cpu_pool().shutdown(wait=False, cancel_futures=True)
+        get_cpu_pool.cache_clear()
+
+# =================== OPENAI CALLS WITH RETRY ===================
+# Transient failures are retried here; the clients are built with max_retries=0
+# so the SDK's own retries don't multiply these attempts.
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+_exponential_wait = wait_exponential_jitter(initial=1, max=LLM_RETRY_MAX_WAIT)
+
+def _retry_wait(retry_state) -> float:
+    """Honor the server's Retry-After header, otherwise back off exponentially with jitter"""
+    error = retry_state.outcome.exception()
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            return min(float(response.headers.get("retry-after")), LLM_RETRY_MAX_WAIT)
+        except (TypeError, ValueError):
+            pass
+    return _exponential_wait(retry_state)
+
+def _log_retry(retry_state):
+    log.warning(
+        "OpenAI call failed (attempt %s/%s), retrying: %s",
+        retry_state.attempt_number, LLM_RETRY_ATTEMPTS, retry_state.outcome.exception()
+    )
+
+llm_retry = retry(
+    wait=_retry_wait,
+    stop=stop_after_attempt(LLM_RETRY_ATTEMPTS),
+    retry=retry_if_exception_type(RETRYABLE_ERRORS),
+    before_sleep=_log_retry,
+    reraise=True
+)
+
+@llm_retry
+async def chat_completion(client: AsyncOpenAI, **kwargs):
+    """Create a chat completion, retrying transient errors"""
+    return await client.chat.completions.create(**kwargs)
+
+@llm_retry
+async def create_embeddings(client: AsyncOpenAI, **kwargs):
+    """Create embeddings, retrying transient errors"""
+    return await client.embeddings.create(**kwargs)
+
+async def gather_limited(coros, limit: int, return_exceptions: bool = False) -> List[Any]:
+    """
+    Run coroutines concurrently, at most limit at a time
+    
+    Results are returned in input order. With return_exceptions, errors are
+    returned in place of results, but cancellation still propagates. The
+    semaphore is created per call, so it always belongs to the caller's loop.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    results = await asyncio.gather(*(run(coro) for coro in coros), return_exceptions=return_exceptions)
+    if return_exceptions:
+        for result in results:
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+    return results
+
+def copy_project_tree(src: str, dst: str) -> int:
+    """
+    Copy a project folder, using a thread pool for trees with many files
+    
+    Returns:
+        Number of files copied
+    """
+    files = []
+    for root, _, names in os.walk(src):
+        rel_root = os.path.relpath(root, src)
+        for name in names:
+            files.append((os.path.join(root, name), os.path.join(dst, rel_root, name)))
+
+    if len(files) <= COPY_THREAD_THRESHOLD:
+        shutil.copytree(src, dst, dirs_exist_ok=True)
+        return len(files)
+
+    for dst_dir in {os.path.dirname(dst_file) for _, dst_file in files}:
+        os.makedirs(dst_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        list(executor.map(lambda pair: shutil.copy2(*pair), files))
+    return len(files)
+
+def extract_project_archive(archive: BinaryIO, dst: str) -> int:
+    """
+    Extract a ZIP archive straight into a project folder
+    
+    Returns:
+        Number of files extracted
+    """
+    with zipfile.ZipFile(archive, "r") as zip_ref:
+        zip_ref.extractall(dst)
+        return sum(1 for info in zip_ref.infolist() if not info.is_dir())
+
+# =================== DOCUMENT PARSING ===================
+# These run inside worker processes, so they must stay top-level (picklable)
+# and report failures by raising rather than logging.
+# Sentence ends, or line breaks (table rows and lists have no sentence punctuation)
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*")
+
+def chunk_text(text: str) -> List[str]:
+    """
+    Split text into chunks of about CHUNK_TOKENS tokens on sentence boundaries
+    
+    Consecutive chunks share up to CHUNK_OVERLAP_TOKENS tokens of whole
+    sentences. A single sentence longer than a chunk is cut into token windows.
+    """
+    if not text.strip():
+        return []
+        
+    # Sentence spans in the original text, so chunks keep their whitespace
+    spans = []
+    start = 0
+    for boundary in SENTENCE_BOUNDARY.finditer(text):
+        if text[start:boundary.start()].strip():
+            spans.append((start, boundary.start()))
+        start = boundary.end()
+    if text[start:].strip():
+        spans.append((start, len(text)))
+        
+    encoding = get_token_encoding()
+    token_counts = np.fromiter(
+        (len(tokens) for tokens in encoding.encode_ordinary_batch([text[a:b] for a, b in spans])),
+        dtype=np.int64, count=len(spans)
+    )
+    # prefix[i] is the token count of sentences [0, i), so chunk and overlap
+    # boundaries can be found by binary search instead of sentence by sentence
+    prefix = np.concatenate(([0], np.cumsum(token_counts)))
+    
+    chunks = []
+    run_start = 0
+    # Sentences longer than a chunk split the text into runs packed independently
+    for long_sentence in np.flatnonzero(token_counts > CHUNK_TOKENS).tolist() + [len(spans)]:
+        start = first = run_start  # First sentence of the chunk, and first not in the previous one
+        while first < long_sentence:
+            # Always take the first new sentence, then as many more as fit in CHUNK_TOKENS
+            fit = int(np.searchsorted(prefix, prefix[start] + CHUNK_TOKENS, side="right")) - 1
+            end = min(max(first + 1, fit), long_sentence)
+            chunks.append(text[spans[start][0]:spans[end - 1][1]])
+            # Carry the longest tail of whole sentences within CHUNK_OVERLAP_TOKENS over
+            overlap = int(np.searchsorted(prefix, prefix[end] - CHUNK_OVERLAP_TOKENS, side="left"))
+            start, first = max(start, overlap), end
+            
+        if long_sentence < len(spans):
+            a, b = spans[long_sentence]
+            tokens = encoding.encode_ordinary(text[a:b])
+            step = CHUNK_TOKENS - CHUNK_OVERLAP_TOKENS
+            chunks.extend(encoding.decode(tokens[i:i + CHUNK_TOKENS]) for i in range(0, len(tokens), step))
+        run_start = long_sentence + 1
+    return chunks
+
+def file_content_hash(file_path: str) -> str:
+    """Hash a file's contents in blocks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+@lru_cache(maxsize=1)
+def _load_pymupdf():
+    """MuPDF (C) is the fastest text extractor available; None if PyMuPDF is not installed"""
+    try:
+        import pymupdf
+    except ImportError:
+        return None
+    return pymupdf
+
+@lru_cache(maxsize=1)
+def _load_pdfium():
+    """PDFium (C++) extracts text several times faster than pure-Python pypdf; None if not installed"""
+    try:
+        import pypdfium2
+    except ImportError:
+        return None
+    return pypdfium2
+
+def extract_pdf_text(pdf_path: str) -> str:
+    """Extract all text from a PDF file"""
+    return extract_pdf(pdf_path)[0]
+
+def extract_pdf(pdf_path: str) -> Tuple[str, int]:
+    """
+    Extract all text from a PDF file, trying the fastest available parser first
+    Returns tuple of (text content, page count)
+    """
+    for load, extract in ((_load_pymupdf, _extract_pdf_pymupdf), (_load_pdfium, _extract_pdf_pdfium)):
+        module = load()
+        if module is not None:
+            try:
+                return extract(module, pdf_path)
+            except Exception:
+                pass  # Fall through; pypdf tolerates some files the C parsers reject
+    from pypdf import PdfReader
+    reader = PdfReader(pdf_path)
+    text = "".join(
+        page_text + "\n\n" for page_text in (page.extract_text() for page in reader.pages) if page_text
+    )
+    return text, len(reader.pages)
+
+# Neither MuPDF nor PDFium is thread-safe; worker processes each get their own copy of these locks
+_PYMUPDF_LOCK = threading.Lock()
+_PDFIUM_LOCK = threading.Lock()
+
+def _extract_pdf_pymupdf(pymupdf, pdf_path: str) -> Tuple[str, int]:
+    with _PYMUPDF_LOCK:
+        with pymupdf.open(pdf_path) as doc:
+            page_texts = [page.get_text("text") for page in doc]
+            page_count = doc.page_count
+    return "".join(page_text + "\n\n" for page_text in page_texts if page_text), page_count
+
+def _extract_pdf_pdfium(pdfium, pdf_path: str) -> Tuple[str, int]:
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            page_texts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                page_texts.append(textpage.get_text_range().replace("\r\n", "\n"))
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+    return "".join(page_text + "\n\n" for page_text in page_texts if page_text), len(page_texts)
+
+# WordprocessingML namespace, as used in element tags
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+def extract_docx_text(docx_path: str) -> str:
+    """
+    Extract all text from a Word document
+    
+    Reads word/document.xml with lxml directly instead of building python-docx's
+    object model: body paragraphs one per line, then table rows as "cell | cell".
+    """
+    from lxml import etree
+    with zipfile.ZipFile(docx_path) as archive:
+        root = etree.fromstring(archive.read("word/document.xml"))
+    body = root.find(f"{WORD_NS}body")
+    if body is None:
+        return ""
+        
+    lines = [_docx_paragraph_text(p) for p in body.iterchildren(f"{WORD_NS}p")]
+    for table in body.iterchildren(f"{WORD_NS}tbl"):
+        for row in table.iterchildren(f"{WORD_NS}tr"):
+            lines.append(" | ".join(
+                "\n".join(_docx_paragraph_text(p) for p in cell.iterchildren(f"{WORD_NS}p"))
+                for cell in row.iterchildren(f"{WORD_NS}tc")
+            ))
+    return "".join(line + "\n" for line in lines)
+
+def _docx_paragraph_text(paragraph) -> str:
+    parts = []
+    for node in paragraph.iter(f"{WORD_NS}t", f"{WORD_NS}tab", f"{WORD_NS}br", f"{WORD_NS}cr"):
+        if node.tag == f"{WORD_NS}t":
+            parts.append(node.text or "")
+        elif node.tag == f"{WORD_NS}tab":
+            parts.append("\t")
+        else:
+            parts.append("\n")
+    return "".join(parts)
+
+def extract_excel_data(excel_path: str) -> Tuple[str, List[str]]:
+    """
+    Extract all data from Excel as text, including sheet names and file path context
+    Returns tuple of (text content, list of sheet names)
+    """
+    from openpyxl import load_workbook
+    wb = load_workbook(excel_path, data_only=True, read_only=True)
+    
+    text = io.StringIO()
+    sheet_names = []
+    
+    # Add file path context
+    file_name = os.path.basename(excel_path)
+    parent_folder = os.path.basename(os.path.dirname(excel_path))
+    text.write(f"File: {file_name}\nLocation: {parent_folder}")
+    
+    try:
+        for sheet_name in wb.sheetnames:
+            sheet_names.append(sheet_name)
+            sheet = wb[sheet_name]
+            text.write(f"\n\nSheet: {sheet_name}")
+            
+            for row_count, row in enumerate(sheet.iter_rows(values_only=True), 1):
+                if row_count > EXCEL_MAX_ROWS:
+                    text.write(f"\n[Note: Truncated after {EXCEL_MAX_ROWS} rows]")
+                    break
+                # Skip fully empty rows before converting any cells
+                if all(cell is None for cell in row):
+                    continue
+                    
+                row_values = ["" if cell is None else str(cell) for cell in row]
+                # Only add rows that have some content; isspace avoids a stripped copy per cell
+                if any(val and not val.isspace() for val in row_values):
+                    text.write("\n")
+                    text.write(" | ".join(row_values))
+    finally:
+        wb.close()
+    return text.getvalue(), sheet_names
+
+def parse_and_chunk(file_path: str, project_path: str) -> Tuple[List[str], Dict[str, Any]]:
+    """
+    Extract a document's text and split it into chunks
+    
+    Args:
+        file_path: Path of the document to parse
+        project_path: Root folder of the project (for the relative path)
+        
+    Returns:
+        Tuple of (chunks, document metadata)
+    """
+    file_name = os.path.basename(file_path)
+    parent_folder = os.path.basename(os.path.dirname(file_path))
+    ext = os.path.splitext(file_path)[1].lower()
+    metadata = {
+        "source": file_path,
+        "file_name": file_name,
+        "parent_folder": parent_folder,
+        "relative_path": os.path.relpath(file_path, project_path),
+        "file_type": ext.replace(".", ""),
+        "timestamp": datetime.now().isoformat()
+    }
+    
+    if ext == ".pdf":
+        document_text, metadata["pages"] = extract_pdf(file_path)
+    elif ext in [".docx", ".doc"]:
+        document_text = extract_docx_text(file_path)
+    elif ext in [".xlsx", ".xls"]:
+        document_text, sheet_names = extract_excel_data(file_path)
+        # Chroma metadata values must be scalars
+        metadata["sheet_names"] = ", ".join(sheet_names)
+    elif ext == ".txt":
+        with open(file_path, "r", encoding="utf-8") as f:
+            document_text = f.read()
+    else:
+        raise ValueError(f"Unsupported file type: {file_path}")
+    
+    if not document_text.strip():
+        return [], metadata
+    if ext not in [".xlsx", ".xls"]:
+        document_text = f"File: {file_name}\nLocation: {parent_folder}\n\n{document_text}"
+    return chunk_text(document_text), metadata
+
+def parse_document(file_path: str, project_path: str) -> Tuple[List[str], List[int], Dict[str, Any]]:
+    """
+    Parse and chunk a document and fingerprint its chunks in one worker call
+    
+    Returns:
+        Tuple of (chunks, chunk SimHashes, document metadata)
+    """
+    chunks, metadata = parse_and_chunk(file_path, project_path)
+    return chunks, [simhash(chunk) for chunk in chunks], metadata
+
+# =================== QUERY CACHE ===================
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so equivalent queries share a cache slot"""
+    return " ".join(query.lower().split())
+
+@lru_cache(maxsize=1)
+def get_query_cache() -> FanoutCache:
+    """Process-wide sharded disk cache behind every TieredCache"""
+    return FanoutCache(
+        QUERY_CACHE_DIR,
+        shards=QUERY_CACHE_SHARDS,
+        size_limit=QUERY_CACHE_SIZE_LIMIT,
+        # "least-recently-used" rewrites an access time on every get, turning reads into
+        # writes that contend for the shard lock; entries expire within the TTL anyway
+        eviction_policy="least-recently-stored",
+        tag_index=True,
+        # WAL lets readers proceed while a shard is being written (diskcache's default,
+        # kept explicit since concurrent reads depend on it)
+        sqlite_journal_mode="wal",
+        sqlite_synchronous=1  # NORMAL: no fsync per write in WAL mode
+    )
+
+class TieredCache:
+    def __init__(self, namespace: str, maxsize: int = QUERY_CACHE_MEMORY_SIZE, ttl: float = QUERY_CACHE_TTL):
+        """
+        In-memory LRU in front of a namespace of the shared disk cache
+        
+        Args:
+            namespace: Prefix (and eviction tag) for this cache's disk entries
+            maxsize: Maximum entries held in memory
+            ttl: Seconds an entry stays valid in either layer
+        """
+        self.namespace = namespace
+        self.disk_cache = get_query_cache()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+
+    @staticmethod
+    def make_key(key_text: str) -> str:
+        # Keys only need to be collision-free, not cryptographic
+        if xxhash is not None:
+            return xxhash.xxh3_128_hexdigest(key_text)
+        return hashlib.blake2b(key_text.encode(), digest_size=16).hexdigest()
+
+    def get(self, key_text: str) -> Any:
+        key = self.make_key(key_text)
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._memory.move_to_end(key)
+                return value
+            del self._memory[key]
+            
+        value = self.disk_cache.get(f"{self.namespace}:{key}")
+        if value is not None:
+            self._remember(key, value)
+        return value
+
+    def set(self, key_text: str, value: Any):
+        key = self.make_key(key_text)
+        self.disk_cache.set(f"{self.namespace}:{key}", value, expire=self.ttl, tag=self.namespace)
+        self._remember(key, value)
+
+    def clear(self):
+        """Drop this namespace's entries from both layers"""
+        self._memory.clear()
+        self.disk_cache.evict(self.namespace)
+
+    def _remember(self, key: str, value: Any):
+        self._memory[key] = (time.monotonic() + self.ttl, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+class SemanticCache:
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, maxsize: int = SEMANTIC_CACHE_SIZE,
+                 ttl: float = QUERY_CACHE_TTL):
+        """
+        In-memory cache looked up by query embedding, so paraphrased questions
+        ("What is the budget?", "whats the budget") share an answer
+        
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            maxsize: Maximum entries held; the oldest are dropped first
+            ttl: Seconds an entry stays valid
+        """
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._vectors: Optional[np.ndarray] = None  # One unit-normalized query embedding per row
+        self._entries: List[Tuple[float, Any]] = []  # (expires_at, value) per row, oldest first
+
+    def get(self, embedding: np.ndarray) -> Any:
+        self._expire()
+        if not self._entries:
+            return None
+        scores = self._vectors @ self._normalize(embedding)
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return self._entries[best][1]
+
+    def set(self, embedding: np.ndarray, value: Any):
+        self._expire()
+        row = self._normalize(embedding)[np.newaxis]
+        self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])[-self.maxsize:]
+        self._entries = (self._entries + [(time.monotonic() + self.ttl, value)])[-self.maxsize:]
+
+    def clear(self):
+        self._vectors = None
+        self._entries = []
+
+    def _expire(self):
+        # Every entry has the same TTL, so the expired ones are a prefix
+        now = time.monotonic()
+        expired = next((i for i, (expires_at, _) in enumerate(self._entries) if expires_at > now), len(self._entries))
+        if expired:
+            self._vectors = self._vectors[expired:]
+            self._entries = self._entries[expired:]
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+# =================== EMBEDDING CACHE ===================
+class EmbeddingCache:
+    def __init__(self, db_path: str = EMBEDDING_CACHE_PATH, dtype: Optional[str] = None,
+                 ttl: Optional[float] = None):
+        """
+        Persistent embedding cache keyed by (model, blake2b(text))
+        
+        Vectors are stored int8-quantized by default (a quarter of the float32
+        size). OpenAI embeddings are unit-normalized, and symmetric per-vector
+        int8 quantization keeps cosine similarity within about 1e-3 of the
+        float32 value, which leaves top-k retrieval practically unchanged.
+        
+        Args:
+            db_path: Path to the SQLite database file
+            dtype: Storage format (int8, float16 or float32); defaults to
+                EMBEDDING_CACHE_DTYPE or the EMBEDDING_CACHE_DTYPE env var
+            ttl: Seconds a vector is kept; defaults to EMBEDDING_CACHE_TTL
+        """
+        self.db_path = db_path
+        self.dtype = dtype or os.getenv('EMBEDDING_CACHE_DTYPE', EMBEDDING_CACHE_DTYPE)
+        if self.dtype not in ("int8", "float16", "float32"):
+            raise ValueError(f"Unsupported embedding cache dtype: {self.dtype}")
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key BLOB PRIMARY KEY, vector BLOB NOT NULL, dtype TEXT NOT NULL DEFAULT 'float32')"
+        )
+        # Caches created before quantization have no dtype column; their rows are float32
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(embeddings)")]
+        if "dtype" not in columns:
+            self.conn.execute("ALTER TABLE embeddings ADD COLUMN dtype TEXT NOT NULL DEFAULT 'float32'")
+        # Caches created before eviction have no write time; count their rows as written now
+        if "created_at" not in columns:
+            self.conn.execute("ALTER TABLE embeddings ADD COLUMN created_at REAL NOT NULL DEFAULT 0")
+            self.conn.execute("UPDATE embeddings SET created_at = ?", (time.time(),))
+        self.conn.execute("CREATE INDEX IF NOT EXISTS embeddings_created_at ON embeddings (created_at)")
+        self.ttl = ttl if ttl is not None else EMBEDDING_CACHE_TTL
+        self.evict_expired()
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, text: str) -> bytes:
+        return hashlib.blake2b((model + "|" + text).encode(), digest_size=16).digest()
+
+    @staticmethod
+    def encode_vector(vector: np.ndarray, dtype: str) -> bytes:
+        """Serialize a vector, quantizing it for the int8 and float16 formats"""
+        v = np.asarray(vector, dtype=np.float32)
+        if dtype == "int8":
+            # Symmetric per-vector scale; the float32 scale is appended to the codes
+            max_abs = float(np.max(np.abs(v))) if v.size else 0.0
+            scale = max_abs / 127 if max_abs > 0 else 1.0
+            q = np.round(v / scale).astype(np.int8)
+            return q.tobytes() + struct.pack("<f", scale)
+        if dtype == "float16":
+            return v.astype(np.float16).tobytes()
+        return v.tobytes()
+
+    @staticmethod
+    def decode_vector(blob: bytes, dtype: str) -> np.ndarray:
+        """Deserialize a stored vector back to a float32 array"""
+        if dtype == "int8":
+            (scale,) = struct.unpack("<f", blob[-4:])
+            q = np.frombuffer(blob[:-4], dtype=np.int8)
+            return q.astype(np.float32) * np.float32(scale)
+        if dtype == "float16":
+            return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+        return np.frombuffer(blob, dtype=np.float32)
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up cached vectors; returns None for each text that is not cached"""
+        keys = [self.make_key(model, text) for text in texts]
+        found = {}
+        # Rows past the TTL are misses even before evict_expired removes them
+        oldest = time.time() - self.ttl
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            key_batch = keys[i:i + 500]
+            placeholders = ",".join("?" * len(key_batch))
+            rows = self.conn.execute(
+                f"SELECT key, vector, dtype FROM embeddings WHERE key IN ({placeholders}) AND created_at >= ?",
+                [*key_batch, oldest]
+            ).fetchall()
+            found.update((key, (vector, dtype)) for key, vector, dtype in rows)
+
+        vectors = [
+            self.decode_vector(*found[key]) if key in found else None
+            for key in keys
+        ]
+        hits = sum(vector is not None for vector in vectors)
+        self.hits += hits
+        self.misses += len(texts) - hits
+        return vectors
+
+    def set_many(self, model: str, texts: List[str], vectors: List[np.ndarray]):
+        """Store vectors for the given texts"""
+        now = time.time()
+        self.conn.executemany(
+            # Re-embedded (expired) rows get the new vector and a fresh write time
+            "INSERT INTO embeddings (key, vector, dtype, created_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET vector = excluded.vector, dtype = excluded.dtype, "
+            "created_at = excluded.created_at",
+            [
+                (self.make_key(model, text), self.encode_vector(vector, self.dtype), self.dtype, now)
+                for text, vector in zip(texts, vectors)
+            ]
+        )
+        self.conn.commit()
+
+    def evict_expired(self) -> int:
+        """Delete vectors older than the TTL; returns the number removed"""
+        cursor = self.conn.execute(
+            "DELETE FROM embeddings WHERE created_at < ?", (time.time() - self.ttl,)
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def cache_stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+# =================== EMBEDDING BATCHER ===================
+class EmbeddingBatcher:
+    def __init__(self, client: AsyncOpenAI, model: str = EMBEDDING_MODEL, cache: Optional[EmbeddingCache] = None,
+                 dimensions: Optional[int] = EMBEDDING_DIMENSIONS):
+        """
+        Collect texts from concurrent callers and embed them in batched requests
+        
+        Args:
+            client: Async OpenAI client used for the embeddings requests
+            model: Embedding model name
+            cache: Persistent embedding cache consulted before calling the API
+            dimensions: Output size for models that can shorten their vectors
+                (None for the model's full size)
+        """
+        self.client = client
+        self.model = model
+        self.dimensions = dimensions
+        # Identifies the vector space; vectors from different signatures aren't comparable
+        self.signature = f"{model}:{dimensions}" if dimensions else model
+        self.cache = cache
+        self.encoding = get_token_encoding()
+        self._queue = None
+        self._worker = None
+        self._request_slots = None  # Bounds the embedding requests in flight
+        self._flushes = set()  # In-flight batch tasks, referenced until done
+        self._pending = {}  # text -> future, so concurrent callers share one request
+
+    async def embed(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed a list of texts, returning vectors in the same order"""
+        if not texts:
+            return []
+        if self.cache is None:
+            return await self._embed_uncached(texts)
+
+        # Identical chunks (boilerplate headers, repeated tables) are looked up once
+        distinct_texts = list(dict.fromkeys(texts))
+        vectors = self.cache.get_many(self.signature, distinct_texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            missing_texts = [distinct_texts[i] for i in missing]
+            new_vectors = await self._embed_uncached(missing_texts)
+            self.cache.set_many(self.signature, missing_texts, new_vectors)
+            for i, vector in zip(missing, new_vectors):
+                vectors[i] = vector
+        by_text = dict(zip(distinct_texts, vectors))
+        return [by_text[text] for text in texts]
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Embedding cache hit/miss counters"""
+        if self.cache is None:
+            return {"hits": 0, "misses": 0}
+        return self.cache.cache_stats()
+
+    async def _embed_uncached(self, texts: List[str]) -> List[np.ndarray]:
+        """Queue texts for the batching worker and wait for their vectors"""
+        self._ensure_worker()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = self._pending.get(text)
+            if future is None:
+                future = loop.create_future()
+                self._pending[text] = future
+                future.add_done_callback(lambda _, text=text: self._pending.pop(text, None))
+                self._queue.put_nowait((text, future))
+            futures.append(future)
+        return list(await asyncio.gather(*futures))
+
+    def _ensure_worker(self):
+        """Start the batching worker on the running event loop if needed"""
+        # The app keeps one long-lived loop, but a batcher can still be driven
+        # from another (e.g. asyncio.run in scripts), so the worker and its
+        # queue are recreated whenever the loop changes
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._request_slots = asyncio.Semaphore(EMBED_MAX_CONCURRENT_REQUESTS)
+            self._flushes = set()
+            self._pending = {}
+            self._worker = loop.create_task(self._run())
+
+    async def _run(self):
+        """
+        Drain the queue into batches of up to EMBED_BATCH_SIZE texts
+        
+        Each batch is sent as its own task, so the next batch is collected (and
+        documents keep being parsed and chunked) while earlier requests are in flight.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._request_slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + EMBED_BATCH_WINDOW
+            while len(batch) < EMBED_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            flush = loop.create_task(self._flush(batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+            flush.add_done_callback(lambda _: self._request_slots.release())
+
+    def _split_by_tokens(self, texts: List[str]) -> List[List[str]]:
+        """Split texts into request-sized groups by token count"""
+        groups = []
+        current = []
+        current_tokens = 0
+        # encode_ordinary treats special-token text ("<|endoftext|>") in documents as plain text
+        token_counts = [len(tokens) for tokens in self.encoding.encode_ordinary_batch(texts)]
+        for text, tokens in zip(texts, token_counts):
+            if current and current_tokens + tokens > EMBED_MAX_TOKENS_PER_REQUEST:
+                groups.append(current)
+                current = []
+                current_tokens = 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+
+    async def _flush(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Embed one batch and resolve the waiting futures"""
+        texts = [text for text, _ in batch]
+        options = {"dimensions": self.dimensions} if self.dimensions else {}
+        try:
+            # A batch over the per-request token limit is sent as concurrent requests
+            responses = await asyncio.gather(*(
+                # base64 skips parsing 1536 JSON floats per text; decoded straight to float32
+                create_embeddings(
+                    self.client, model=self.model, input=request_texts, encoding_format="base64", **options
+                )
+                for request_texts in self._split_by_tokens(texts)
+            ))
+            embeddings = [
+                np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32)
+                for response in responses for item in response.data
+            ]
+        except asyncio.CancelledError:
+            # Don't leave callers waiting on futures that will never resolve
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            log.error("Failed to embed batch of %s texts: %s", len(texts), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+# =================== NEAR-DUPLICATE DETECTION ===================
+def simhash(text: str) -> int:
+    """64-bit SimHash of a text's word shingles; near-identical texts differ in few bits"""
+    words = text.lower().split()
+    shingles = [
+        " ".join(words[i:i + SIMHASH_SHINGLE_SIZE])
+        for i in range(max(1, len(words) - SIMHASH_SHINGLE_SIZE + 1))
+    ]
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little") for shingle in shingles],
+        dtype=np.uint64
+    )
+    # Each fingerprint bit is the majority vote of that bit across all shingle hashes
+    bits = np.unpackbits(hashes.view(np.uint8)).reshape(-1, 64)
+    majority = (bits.sum(axis=0) * 2 > len(shingles)).astype(np.uint8)
+    return int(np.packbits(majority).view(np.uint64)[0])
+
+class SimHashIndex:
+    def __init__(self, path: str):
+        """
+        Persistent map from chunk SimHash to the id of the stored chunk
+        
+        Args:
+            path: JSON file holding the index
+        """
+        self.path = path
+        self.chunk_ids: Dict[int, str] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    self.chunk_ids = {int(h, 16): chunk_id for h, chunk_id in orjson.loads(f.read()).items()}
+            except Exception as e:
+                log.error("Loading SimHash index failed: %s", e)
+        self._hashes = None  # Array of the keys, rebuilt after changes
+
+    def find(self, fingerprint: int) -> Optional[str]:
+        """Id of a stored chunk within SIMHASH_MAX_DISTANCE bits, if any"""
+        if not self.chunk_ids:
+            return None
+        if self._hashes is None:
+            self._hashes = np.fromiter(self.chunk_ids.keys(), dtype=np.uint64, count=len(self.chunk_ids))
+        # Popcount via unpackbits; np.bitwise_count needs NumPy 2
+        distances = np.unpackbits((self._hashes ^ np.uint64(fingerprint)).view(np.uint8)).reshape(-1, 64).sum(axis=1)
+        best = int(np.argmin(distances))
+        if distances[best] > SIMHASH_MAX_DISTANCE:
+            return None
+        return self.chunk_ids[int(self._hashes[best])]
+
+    def add_many(self, fingerprints: List[int], chunk_ids: List[str]):
+        self.chunk_ids.update(zip(fingerprints, chunk_ids))
+        self._hashes = None
+
+    def remove_many(self, chunk_ids: List[str]):
+        """Forget the fingerprints that point at the given chunks (rewritten or deleted)"""
+        removed = set(chunk_ids)
+        if not removed:
+            return
+        self.chunk_ids = {fp: chunk_id for fp, chunk_id in self.chunk_ids.items() if chunk_id not in removed}
+        self._hashes = None
+
+    def clear(self):
+        self.chunk_ids.clear()
+        self._hashes = None
+
+    def save(self):
+        try:
+            with open(self.path, "wb") as f:
+                f.write(orjson.dumps({format(h, "016x"): chunk_id for h, chunk_id in self.chunk_ids.items()}))
+        except Exception as e:
+            log.error("Saving SimHash index failed: %s", e)
+
 # =================== PROJECT RAG CLASS ===================
 class ProjectRAG:
-    def __init__(self, project_name: str, project_path: str):
+    def __init__(self, project_name: str, project_path: str, embedder: Optional[EmbeddingBatcher] = None,
+                 cpu_pool: Optional[ProcessPoolExecutor] = None, client: Optional[AsyncOpenAI] = None,
+                 on_reset: Optional[Callable[[], None]] = None):
         """
         Initialize a RAG system for a specific project
         
         Args:
             project_name: Name of the project (used for the collection name)
             project_path: Path to the project's documents folder
+            embedder: Shared embedding batcher (a private one is created if omitted)
+            cpu_pool: Process pool for parsing documents (parsed inline if omitted)
+            client: Shared OpenAI client (a private one is created if omitted)
+            on_reset: Called after the collection is dropped, so callers can
+                invalidate results derived from it
         """
         self.project_name = project_name
         self.project_path = project_path
+        self.on_reset = on_reset
         self.openai_key = openai_key
-        self.client = OpenAI(api_key=self.openai_key)
+        self.client = client or AsyncOpenAI(
+            api_key=self.openai_key, http_client=get_async_http_client(), max_retries=0
+        )
         self.llm_model_name = os.getenv('LLM_MODEL', DEFAULT_LLM_MODEL)
+        self.llm_concurrency = int(os.getenv('LLM_CONCURRENCY', DEFAULT_LLM_CONCURRENCY))
+        self.embedder = embedder or EmbeddingBatcher(self.client, cache=EmbeddingCache())
+        self.cpu_pool = cpu_pool
+        self.ingest_concurrency = int(os.getenv('INGEST_CONCURRENCY', DEFAULT_INGEST_CONCURRENCY))
+        self.bulk_loading = False
+        self._bulk_ids: Set[str] = set()  # Ids written (or attempted) during the current bulk load
+        
+        # Embedded chunks waiting to be written, buffered across documents
+        self._pending_writes: List[Dict[str, Any]] = []
+        self._pending_chunks = 0
+        self._failed_writes: Dict[str, str] = {}
+        self._write_lock = threading.Lock()
         
         # Sanitize collection name
         collection_name = sanitize_name(project_name)
@@ -89,19 +1159,23 @@ class ProjectRAG:
         self.db_path = f"./chromadb_storage/{collection_name}"
         os.makedirs(self.db_path, exist_ok=True)
         self.chroma_client = chromadb.PersistentClient(path=self.db_path)
-        self.collection = self.chroma_client.get_or_create_collection(
-            name=collection_name,
-            embedding_function=OpenAIEmbeddingFunction(api_key=openai_key)
-        )
+        self.collection = self._open_collection(collection_name)
         
         # Caching
-        self.cache = PersistentCache(cache_dir=f"./cache/{collection_name}", ttl=3600)
-        self.response_cache = PersistentCache(cache_dir=f"./response_cache/{collection_name}", ttl=3600)
+        self.cache = TieredCache(f"{collection_name}:query")
+        self.response_cache = TieredCache(f"{collection_name}:response")
+        self.semantic_cache = SemanticCache()
         
         # Ingestion metadata to avoid reprocessing unchanged files
         self.metadata_path = f"ingestion_metadata_{collection_name}.json"
+        self.simhash_index = SimHashIndex(f"simhash_index_{collection_name}.json")
         self.ingestion_metadata = self.load_ingestion_metadata()
         
+        # Vectors from another embedding model (or size) can't be compared with
+        # this one's queries, so such a collection is rebuilt on the next ingest
+        if (self.collection.metadata or {}).get("embedding_model") != self.embedder.signature:
+            self.reset_collection()
+        
         # Statistics
         self.stats = {
             "documents_processed": 0,
@@ -109,67 +1183,105 @@ class ProjectRAG:
             "last_update": None
         }
 
+    def _open_collection(self, collection_name: str):
+        """Open the project's collection, creating it with the index settings if needed"""
+        return self.chroma_client.get_or_create_collection(
+            name=collection_name,
+            # Documents and queries are embedded by the shared EmbeddingBatcher
+            embedding_function=None,
+            # Buffer new vectors and fold them into the HNSW graph in large batches,
+            # instead of updating (and persisting) the index every 100 adds.
+            # Graph parameters are tuned for recall at 100K+ chunks.
+            # Only applies to newly created collections.
+            metadata={
+                "hnsw:space": HNSW_SPACE,
+                "hnsw:M": HNSW_M,
+                "hnsw:construction_ef": HNSW_CONSTRUCTION_EF,
+                "hnsw:search_ef": HNSW_SEARCH_EF,
+                "hnsw:batch_size": HNSW_BATCH_SIZE,
+                "hnsw:sync_threshold": HNSW_SYNC_THRESHOLD,
+                "embedding_model": self.embedder.signature
+            }
+        )
+
+    def reset_collection(self):
+        """Drop every stored chunk and forget the ingested files, so the next ingest re-embeds them"""
+        log.warning("Rebuilding collection for %s with embedding model %s", self.project_name, self.embedder.signature)
+        collection_name = self.collection.name
+        self.chroma_client.delete_collection(collection_name)
+        self.collection = self._open_collection(collection_name)
+        self.ingestion_metadata = {}
+        self.save_ingestion_metadata()
+        self.simhash_index.clear()
+        self.simhash_index.save()
+        self.cache.clear()
+        self.response_cache.clear()
+        self.semantic_cache.clear()
+        if self.on_reset is not None:
+            self.on_reset()
+
     def load_ingestion_metadata(self) -> dict:
         if os.path.exists(self.metadata_path):
             try:
-                with open(self.metadata_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
+                with open(self.metadata_path, "rb") as f:
+                    return orjson.loads(f.read())
             except Exception as e:
-                print(f"[ERROR] Loading metadata failed: {e}")
+                log.error("Loading metadata failed: %s", e)
         return {}
 
     def save_ingestion_metadata(self):
         try:
-            with open(self.metadata_path, "w", encoding="utf-8") as f:
-                json.dump(self.ingestion_metadata, f)
+            with open(self.metadata_path, "wb") as f:
+                f.write(orjson.dumps(self.ingestion_metadata))
         except Exception as e:
-            print(f"[ERROR] Saving metadata failed: {e}")
+            log.error("Saving metadata failed: %s", e)
+
+    async def check_fingerprint(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Compare a file against the fingerprint recorded at its last ingestion
+        
+        Size and mtime are checked first; the content hash is only computed
+        when they differ, so touched or re-copied files are not re-embedded.
+        
+        Returns:
+            The file's new fingerprint if it needs ingesting, None if unchanged
+        """
+        stat = os.stat(file_path)
+        record = self.ingestion_metadata.get(file_path)
+        if isinstance(record, (int, float)):
+            # Metadata written before fingerprints recorded only the mtime
+            record = {"mtime": record}
+        if record and record.get("mtime") == stat.st_mtime and record.get("size") in (None, stat.st_size):
+            return None
+            
+        content_hash = await asyncio.to_thread(file_content_hash, file_path)
+        fingerprint = {"mtime": stat.st_mtime, "size": stat.st_size, "hash": content_hash}
+        if record and record.get("hash") == content_hash:
+            # Same content under a new mtime: remember it and skip (saved once the ingestion ends)
+            self.ingestion_metadata[file_path] = {**record, **fingerprint}
+            return None
+        return fingerprint
 
     # ------------------ DOCUMENT PREPROCESSING ------------------
     def preprocess_text(self, text: str) -> List[str]:
         """Split text into chunks with overlap"""
-        if not text.strip():
-            return []
-            
-        # Simple chunking by characters with overlap
-        chunks = []
-        for i in range(0, len(text), CHUNK_SIZE - CHUNK_OVERLAP):
-            chunk = text[i:i + CHUNK_SIZE]
-            if chunk.strip():
-                chunks.append(chunk)
-        return chunks
+        return chunk_text(text)
 
     # ------------------ DOCUMENT INGESTION METHODS ------------------
     async def extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract all text from a PDF file"""
         try:
-            reader = PdfReader(pdf_path)
-            text = ""
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n\n"
-            return text
+            return await asyncio.to_thread(extract_pdf_text, pdf_path)
         except Exception as e:
-            print(f"[ERROR] Failed to extract PDF {pdf_path}: {e}")
+            log.error("Failed to extract PDF %s: %s", pdf_path, e)
             return ""
 
     async def extract_text_from_docx(self, docx_path: str) -> str:
         """Extract all text from a Word document"""
         try:
-            doc = docx.Document(docx_path)
-            text = ""
-            for para in doc.paragraphs:
-                text += para.text + "\n"
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = []
-                    for cell in row.cells:
-                        row_text.append(cell.text)
-                    text += " | ".join(row_text) + "\n"
-            return text
+            return await asyncio.to_thread(extract_docx_text, docx_path)
         except Exception as e:
-            print(f"[ERROR] Failed to extract DOCX {docx_path}: {e}")
+            log.error("Failed to extract DOCX %s: %s", docx_path, e)
             return ""
 
     async def extract_data_from_excel(self, excel_path: str) -> Tuple[str, List[str]]:
@@ -178,137 +1290,245 @@ class ProjectRAG:
         Returns tuple of (text content, list of sheet names)
         """
         try:
-            print(f"[INFO] Processing Excel file: {excel_path}")
-            # Add timeout protection
-            wb = load_workbook(excel_path, data_only=True, read_only=True)
-            
-            text = []
-            sheet_names = []
-            
-            # Add file path context
-            file_name = os.path.basename(excel_path)
-            parent_folder = os.path.basename(os.path.dirname(excel_path))
-            text.append(f"File: {file_name}")
-            text.append(f"Location: {parent_folder}")
-            
-            for sheet_name in wb.sheetnames:
-                sheet_names.append(sheet_name)
-                sheet = wb[sheet_name]
-                text.append(f"\nSheet: {sheet_name}")
-                
-                # Process rows with a limit to prevent hanging
-                row_count = 0
-                max_rows = 1000  # Limit number of rows to process
-                
-                for row in sheet.iter_rows(values_only=True):
-                    row_count += 1
-                    if row_count > max_rows:
-                        text.append(f"[Note: Truncated after {max_rows} rows]")
-                        break
-                        
-                    # Filter out empty cells and convert to strings
-                    row_values = [str(cell) if cell is not None else "" for cell in row]
-                    # Only add rows that have some content
-                    if any(val.strip() for val in row_values):
-                        text.append(" | ".join(row_values))
-            
-            wb.close()
-            return "\n".join(text), sheet_names
-            
+            log.info("Processing Excel file: %s", excel_path)
+            return await asyncio.to_thread(extract_excel_data, excel_path)
         except Exception as e:
-            print(f"[ERROR] Failed to extract Excel {excel_path}: {e}")
+            log.error("Failed to extract Excel %s: %s", excel_path, e)
             return "", []
 
     async def ingest_document(self, file_path: str) -> bool:
-        """Ingest a document with enhanced context from file path"""
+        """
+        Ingest a document with enhanced context from file path
+        
+        The embedded chunks are buffered and written together with other documents'
+        chunks; call flush_writes once no more documents follow.
+        """
         try:
-            # Check if file has been modified since last ingestion
-            mod_time = os.path.getmtime(file_path)
-            if file_path in self.ingestion_metadata and self.ingestion_metadata[file_path] >= mod_time:
-                print(f"[INFO] File unchanged: {file_path}")
-                return False
-                
-            # Get file context
-            file_name = os.path.basename(file_path)
-            parent_folder = os.path.basename(os.path.dirname(file_path))
-            relative_path = os.path.relpath(file_path, self.project_path)
-            
-            # Extract text based on file type
             ext = os.path.splitext(file_path)[1].lower()
-            document_text = ""
-            metadata = {
-                "source": file_path,
-                "file_name": file_name,
-                "parent_folder": parent_folder,
-                "relative_path": relative_path,
-                "file_type": ext.replace(".", ""),
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            if ext == ".pdf":
-                document_text = await self.extract_text_from_pdf(file_path)
-                document_text = f"File: {file_name}\nLocation: {parent_folder}\n\n{document_text}"
-                
-            elif ext in [".docx", ".doc"]:
-                document_text = await self.extract_text_from_docx(file_path)
-                document_text = f"File: {file_name}\nLocation: {parent_folder}\n\n{document_text}"
-                
-            elif ext in [".xlsx", ".xls"]:
-                document_text, sheet_names = await self.extract_data_from_excel(file_path)
-                metadata["sheet_names"] = sheet_names
-                
-            elif ext == ".txt":
-                with open(file_path, "r", encoding="utf-8") as f:
-                    document_text = f.read()
-                document_text = f"File: {file_name}\nLocation: {parent_folder}\n\n{document_text}"
-            else:
-                print(f"[WARN] Unsupported file type: {file_path}")
+            if ext not in SUPPORTED_EXTENSIONS:
+                log.warning("Unsupported file type: %s", file_path)
                 return False
                 
-            if not document_text.strip():
-                print(f"[WARN] No content extracted from: {file_path}")
+            # Check if file has been modified since last ingestion
+            fingerprint = await self.check_fingerprint(file_path)
+            if fingerprint is None:
+                log.debug("File unchanged: %s", file_path)
                 return False
                 
-            # Process the text into chunks
-            chunks = self.preprocess_text(document_text)
+            # Parsing, chunking and fingerprinting are CPU-bound, so run them on the process pool
+            if self.cpu_pool is not None:
+                loop = asyncio.get_running_loop()
+                chunks, fingerprints, metadata = await loop.run_in_executor(
+                    self.cpu_pool, parse_document, file_path, self.project_path
+                )
+            else:
+                chunks, fingerprints, metadata = await asyncio.to_thread(
+                    parse_document, file_path, self.project_path
+                )
+                
             if not chunks:
-                print(f"[WARN] No chunks created for: {file_path}")
+                log.warning("No content extracted from: %s", file_path)
                 return False
                 
-            # Add chunks to the database
-            for i, chunk in enumerate(chunks):
-                chunk_id = f"{sanitize_name(file_name)}_{i}"
-                chunk_metadata = metadata.copy()
-                chunk_metadata["chunk_index"] = i
-                chunk_metadata["total_chunks"] = len(chunks)
-                
-                # First try to delete existing chunk if it exists
-                try:
-                    self.collection.delete(ids=[chunk_id])
-                except:
-                    pass
-                    
-                # Add the new chunk
-                self.collection.add(
-                    ids=[chunk_id],
-                    documents=[chunk],
-                    metadatas=[chunk_metadata]
-                )
-                
-            # Update metadata and stats
-            self.ingestion_metadata[file_path] = mod_time
-            self.save_ingestion_metadata()
-            self.stats["documents_processed"] += 1
-            self.stats["chunks_stored"] += len(chunks)
-            self.stats["last_update"] = datetime.now().isoformat()
-            
-            print(f"[INFO] Successfully ingested {file_path} with {len(chunks)} chunks")
+            # Add all chunks to the database in as few writes as possible
+            chunk_ids = self.chunk_ids(file_path, len(chunks))
+            record = self.ingestion_metadata.get(file_path)
+            previous_ids = self.chunk_ids(file_path, record.get("chunks", 0) if isinstance(record, dict) else 0)
+            
+            # Embed all chunks in batched requests, reusing the vectors of near-duplicates
+            embeddings = await self.embed_chunks(chunks, chunk_ids, fingerprints, replaced_ids=previous_ids)
+            chunk_metadatas = [
+                # The fingerprint lets a later near-duplicate check it still matches before reusing the vector
+                {**metadata, "chunk_index": i, "total_chunks": len(chunks), "simhash": format(fingerprints[i], "016x")}
+                for i in range(len(chunks))
+            ]
+            self._pending_writes.append({
+                "file_path": file_path,
+                "fingerprint": fingerprint,
+                "ids": chunk_ids,
+                "documents": chunks,
+                "embeddings": embeddings,
+                "metadatas": chunk_metadatas,
+                # The previous version's chunks are deleted before the new ones are written
+                "replaces_previous": file_path in self.ingestion_metadata
+            })
+            self._pending_chunks += len(chunks)
+            if self._pending_chunks >= CHROMA_WRITE_BATCH:
+                await self.flush_writes()
             return True
             
         except Exception as e:
-            print(f"[ERROR] Failed to ingest {file_path}: {e}")
+            log.error("Failed to ingest %s: %s", file_path, e)
             return False
 
+    async def flush_writes(self):
+        """
+        Write all buffered chunks to the collection and record their documents as ingested
+        
+        Documents whose write fails are left out of the ingestion metadata (so they are
+        retried next time) and collected in _failed_writes.
+        """
+        pending, self._pending_writes, self._pending_chunks = self._pending_writes, [], 0
+        if not pending:
+            return
+        try:
+            await asyncio.to_thread(self._write_chunks, pending)
+        except Exception as e:
+            log.error("Failed to write chunks of %s documents: %s", len(pending), e)
+            for doc in pending:
+                self._failed_writes[doc["file_path"]] = str(e)
+            return
+            
+        # Update metadata and stats
+        for doc in pending:
+            self.ingestion_metadata[doc["file_path"]] = {**doc["fingerprint"], "chunks": len(doc["ids"])}
+            self.stats["documents_processed"] += 1
+            self.stats["chunks_stored"] += len(doc["ids"])
+            log.info("Successfully ingested %s with %s chunks", doc["file_path"], len(doc["ids"]))
+        self.save_ingestion_metadata()
+        self.simhash_index.save()
+        self.stats["last_update"] = datetime.now().isoformat()
+
+    def chunk_ids(self, file_path: str, count: int) -> List[str]:
+        """Ids of a document's chunks, keyed by its path within the project so no two documents share one"""
+        relative_path = os.path.relpath(file_path, self.project_path).replace(os.sep, "/")
+        return [f"{relative_path}_{i}" for i in range(count)]
+
+    def _write_chunks(self, pending: List[Dict[str, Any]]):
+        ids, documents, embeddings, metadatas = [], [], [], []
+        for doc in pending:
+            ids.extend(doc["ids"])
+            documents.extend(doc["documents"])
+            embeddings.extend(doc["embeddings"])
+            metadatas.extend(doc["metadatas"])
+        replaced = [doc["file_path"] for doc in pending if doc["replaces_previous"]]
+            
+        # Upsert replaces chunks left over from a previous ingestion of a file;
+        # a first load into an empty collection can use add and skip the id lookups.
+        # add ignores ids that already exist, so any id an earlier flush of this load
+        # wrote (or partly wrote before failing) goes through upsert instead
+        if self.bulk_loading and self._bulk_ids.isdisjoint(ids):
+            write = self.collection.add
+        else:
+            write = self.collection.upsert
+        if self.bulk_loading:
+            self._bulk_ids.update(ids)
+        batch_size = self.chroma_client.get_max_batch_size()
+        with self._write_lock:
+            # A re-ingested document may now have fewer chunks than before, so all
+            # of its previous chunks are dropped (by source) before the new ones land
+            for start in range(0, len(replaced), batch_size):
+                self.collection.delete(where={"source": {"$in": replaced[start:start + batch_size]}})
+            for start in range(0, len(ids), batch_size):
+                end = start + batch_size
+                write(
+                    ids=ids[start:end],
+                    documents=documents[start:end],
+                    embeddings=embeddings[start:end],
+                    metadatas=metadatas[start:end]
+                )
+
+    async def embed_chunks(self, chunks: List[str], chunk_ids: List[str],
+                           fingerprints: Optional[List[int]] = None,
+                           replaced_ids: Optional[List[str]] = None) -> List[np.ndarray]:
+        """
+        Embed chunks, reusing stored vectors for near-duplicates of earlier chunks
+        
+        Exact duplicates are already served by the embedding cache; this catches
+        chunks that differ only by small edits (typos, formatting, reruns). A stored
+        vector is only reused if the chunk now under that id still has a matching
+        fingerprint, since ids are reused when documents are rewritten.
+        
+        Args:
+            chunks: Chunk texts
+            chunk_ids: Ids the chunks will be stored under
+            fingerprints: SimHashes of the chunks, if already computed off the event loop
+            replaced_ids: Ids of the document's previous chunks, dropped from the index
+        """
+        if fingerprints is None:
+            fingerprints = await asyncio.to_thread(lambda: [simhash(chunk) for chunk in chunks])
+        matches = {i: self.simhash_index.find(fp) for i, fp in enumerate(fingerprints)}
+        matches = {i: chunk_id for i, chunk_id in matches.items() if chunk_id is not None}
+        
+        reused = {}
+        if matches:
+            # Embeddings to reuse, plus metadatas for each stored chunk's fingerprint; documents aren't needed
+            stored = await asyncio.to_thread(
+                self.collection.get, ids=list(set(matches.values())), include=["embeddings", "metadatas"]
+            )
+            vectors = {
+                chunk_id: (int(metadata["simhash"], 16), vector)
+                for chunk_id, vector, metadata in zip(stored["ids"], stored["embeddings"], stored["metadatas"])
+                if metadata and "simhash" in metadata
+            }
+            reused = {
+                i: vectors[chunk_id][1] for i, chunk_id in matches.items()
+                if chunk_id in vectors
+                and (vectors[chunk_id][0] ^ fingerprints[i]).bit_count() <= SIMHASH_MAX_DISTANCE
+            }
+            
+        to_embed = [i for i in range(len(chunks)) if i not in reused]
+        new_vectors = await self.embedder.embed([chunks[i] for i in to_embed])
+        
+        embeddings = [None] * len(chunks)
+        for i, vector in reused.items():
+            embeddings[i] = np.asarray(vector, dtype=np.float32)
+        for i, vector in zip(to_embed, new_vectors):
+            embeddings[i] = vector
+            
+        # The previous version's chunks are being replaced; only freshly embedded
+        # chunks become new reference points
+        self.simhash_index.remove_many(replaced_ids or [])
+        self.simhash_index.add_many([fingerprints[i] for i in to_embed], [chunk_ids[i] for i in to_embed])
+        if reused:
+            log.info("Reused vectors for %s near-duplicate chunks", len(reused))
+        return embeddings
+
+    async def remove_deleted_documents(self, file_paths: List[str]) -> List[str]:
+        """
+        Delete the chunks of ingested documents that are no longer in the project folder
+        
+        Chunks are matched on their source path. All removed documents are
+        deleted in batched calls and the metadata is saved once.
+        
+        Args:
+            file_paths: Supported documents currently in the project folder
+            
+        Returns:
+            Paths of the removed documents
+        """
+        current = set(file_paths)
+        removed = [file_path for file_path in self.ingestion_metadata if file_path not in current]
+        if not removed:
+            return []
+
+        def delete_chunks():
+            batch_size = self.chroma_client.get_max_batch_size()
+            with self._write_lock:
+                for start in range(0, len(removed), batch_size):
+                    self.collection.delete(where={"source": {"$in": removed[start:start + batch_size]}})
+        
+        await asyncio.to_thread(delete_chunks)
+        for file_path in removed:
+            record = self.ingestion_metadata.pop(file_path)
+            self.simhash_index.remove_many(
+                self.chunk_ids(file_path, record.get("chunks", 0) if isinstance(record, dict) else 0)
+            )
+        self.save_ingestion_metadata()
+        self.simhash_index.save()
+        log.info("Removed chunks of %s deleted documents", len(removed))
+        return removed
+
+    def list_supported_files(self) -> List[str]:
+        """Paths of all supported documents in the project directory and its subdirectories"""
+        file_paths = []
+        for root, _, files in os.walk(self.project_path):
+            for file in files:
+                # Check if file extension is supported
+                if os.path.splitext(file)[1].lower() in SUPPORTED_EXTENSIONS:
+                    file_paths.append(os.path.join(root, file))
+        return file_paths
+
     async def ingest_directory(self) -> Dict[str, Any]:
         """Ingest all supported documents in the project directory"""
         start_time = time.time()
@@ -316,51 +1536,90 @@ class ProjectRAG:
         skipped_count = 0
         error_count = 0
         
-        print(f"[INFO] Starting ingestion for project: {self.project_name}")
-        print(f"[INFO] Scanning directory: {self.project_path}")
+        log.info("Starting ingestion for project: %s", self.project_name)
+        log.info("Scanning directory: %s", self.project_path)
         
         # Track ingestion metrics
         ingestion_results = {
             "processed_files": [],
             "skipped_files": [],
             "error_files": [],
+            "removed_files": [],
             "start_time": datetime.now().isoformat()
         }
         
-        # Walk through all files in the directory and its subdirectories
-        for root, _, files in os.walk(self.project_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                try:
-                    # Check if file extension is supported
-                    ext = os.path.splitext(file_path)[1].lower()
-                    if ext not in [".pdf", ".docx", ".doc", ".xlsx", ".xls", ".txt"]:
-                        continue
-                        
-                    # Get relative path from project root for metadata
-                    rel_path = os.path.relpath(file_path, self.project_path)
-                    
-                    success = await self.ingest_document(file_path)
-                    if success:
-                        processed_count += 1
-                        ingestion_results["processed_files"].append({
-                            "file": rel_path,
-                            "full_path": file_path
-                        })
-                    else:
-                        skipped_count += 1
-                        ingestion_results["skipped_files"].append({
-                            "file": rel_path,
-                            "full_path": file_path
-                        })
-                except Exception as e:
-                    error_count += 1
-                    ingestion_results["error_files"].append({
-                        "file": rel_path,
-                        "full_path": file_path,
-                        "error": str(e)
-                    })
-                    print(f"[ERROR] Failed to process {file_path}: {e}")
+        # Nothing can be overwritten when the collection starts out empty
+        self.bulk_loading = self.collection.count() == 0
+        self._bulk_ids = set()
+        
+        # Walk through all files in the directory and its subdirectories, off the event loop
+        file_paths = await asyncio.to_thread(self.list_supported_files)
+        
+        # Documents deleted from the folder since the last ingestion take their chunks with them
+        try:
+            removed = await self.remove_deleted_documents(file_paths)
+        except Exception as e:
+            log.error("Failed to remove chunks of deleted documents: %s", e)
+            removed = []
+        ingestion_results["removed_files"] = [
+            {"file": os.path.relpath(file_path, self.project_path), "full_path": file_path}
+            for file_path in removed
+        ]
+        
+        # Ingest files concurrently so parsing, embedding and writes overlap
+        semaphore = asyncio.Semaphore(self.ingest_concurrency)
+
+        async def ingest_one(file_path: str) -> bool:
+            async with semaphore:
+                return await self.ingest_document(file_path)
+
+        try:
+            results = await asyncio.gather(
+                *(ingest_one(file_path) for file_path in file_paths),
+                return_exceptions=True
+            )
+            await self.flush_writes()
+        finally:
+            # One manifest write covers the fingerprints refreshed without re-ingesting
+            self.save_ingestion_metadata()
+            self.bulk_loading = False
+            self._bulk_ids = set()
+            # Drop anything left unwritten by a cancellation; it is re-ingested next time
+            self._pending_writes, self._pending_chunks = [], 0
+        failed_writes, self._failed_writes = self._failed_writes, {}
+        
+        for file_path, result in zip(file_paths, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if file_path in failed_writes:
+                result = RuntimeError(failed_writes[file_path])
+            # Get relative path from project root for metadata
+            rel_path = os.path.relpath(file_path, self.project_path)
+            if isinstance(result, Exception):
+                error_count += 1
+                ingestion_results["error_files"].append({
+                    "file": rel_path,
+                    "full_path": file_path,
+                    "error": str(result)
+                })
+                log.error("Failed to process %s: %s", file_path, result)
+            elif result:
+                processed_count += 1
+                ingestion_results["processed_files"].append({
+                    "file": rel_path,
+                    "full_path": file_path
+                })
+            else:
+                skipped_count += 1
+                ingestion_results["skipped_files"].append({
+                    "file": rel_path,
+                    "full_path": file_path
+                })
+        
+        # Cached retrievals and answers predate the new or removed chunks
+        if processed_count or removed:
+            self.cache.clear()
+            self.semantic_cache.clear()
         
         # Calculate elapsed time
         elapsed_time = time.time() - start_time
@@ -370,111 +1629,165 @@ class ProjectRAG:
         ingestion_results["total_skipped"] = skipped_count
         ingestion_results["total_errors"] = error_count
         
-        print(f"[INFO] Ingestion completed for {self.project_name}")
-        print(f"[INFO] Processed: {processed_count}, Skipped: {skipped_count}, Errors: {error_count}")
-        print(f"[INFO] Elapsed time: {elapsed_time:.2f} seconds")
+        log.info("Ingestion completed for %s", self.project_name)
+        log.info("Processed: %s, Skipped: %s, Errors: %s", processed_count, skipped_count, error_count)
+        log.info("Elapsed time: %.2f seconds", elapsed_time)
         
         return ingestion_results
 
     # ------------------ QUERY & RESPONSE METHODS ------------------
-    async def query_collection(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+    async def query_collection(self, query: str, n_results: int = 5,
+                               query_embedding: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
         """
         Query the collection and return the most relevant chunks with metadata
+        
+        Args:
+            query: Question to retrieve chunks for
+            n_results: Number of chunks to return
+            query_embedding: Embedding of the query, if the caller already has it
         """
         try:
-            # Generate cache key
-            query_hash = hashlib.md5(query.encode()).hexdigest()
-            cached = self.cache.get(query_hash)
+            cache_key = self._retrieval_key(query, n_results)
+            cached = self.cache.get(cache_key)
             if cached:
-                print(f"[INFO] cached: {cached}")
-                if DEBUG:
-                    print(f"[DEBUG] Using cached chunks for query: {query}")
+                log.debug("cached: %s", cached)
+                log.debug("Using cached chunks for query: %s", query)
                 return cached
                 
-            # Query the collection
-            results = self.collection.query(
-                query_texts=[query], 
+            # Embed through the shared batcher (cached, pooled connection)
+            if query_embedding is None:
+                query_embedding = (await self.embedder.embed([query]))[0]
+            
+            # Query the collection off the event loop so searches can overlap
+            results = await asyncio.to_thread(
+                self.collection.query,
+                query_embeddings=[query_embedding], 
                 n_results=n_results, 
                 include=["documents", "metadatas", "distances"]
             )
-            print(f"[INFO] results in query_collection: {results}")
+            log.debug("results in query_collection: %s", results)
 
             if not results["documents"] or not results["documents"][0]:
                 return []
                 
             # Format the results with metadata
-            retrieved = []
-            for i, doc in enumerate(results["documents"][0]):
-                item = {
-                    "content": doc,
-                    "metadata": results["metadatas"][0][i] if results["metadatas"] else {},
-                    "relevance_score": results["distances"][0][i] if results["distances"] else None
-                }
-                retrieved.append(item)
+            retrieved = self._format_results(results, 0)
                 
             # Cache the results
-            self.cache.set(query_hash, retrieved)
+            self.cache.set(cache_key, retrieved)
             
-            if DEBUG:
-                print(f"[DEBUG] Found {len(retrieved)} chunks for query: {query}")
+            log.debug("Found %s chunks for query: %s", len(retrieved), query)
             return retrieved
         except Exception as e:
-            print(f"[ERROR] Error retrieving data for '{query}': {e}")
+            log.error("Error retrieving data for '%s': %s", query, e)
             return []
 
+    async def query_collection_batch(self, queries: List[str], n_results: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Query the collection for several questions at once
+        
+        The uncached queries are embedded in one request and sent to the
+        collection as a single multi-query call.
+        
+        Args:
+            queries: Questions to retrieve chunks for
+            n_results: Number of chunks to return per question
+            
+        Returns:
+            The retrieved chunks for each query, in the order given
+        """
+        cache_keys = [self._retrieval_key(query, n_results) for query in queries]
+        retrieved: List[Optional[List[Dict[str, Any]]]] = [self.cache.get(key) or None for key in cache_keys]
+        missing = [i for i, chunks in enumerate(retrieved) if chunks is None]
+        if not missing:
+            return retrieved
+        
+        try:
+            query_embeddings = await self.embedder.embed([queries[i] for i in missing])
+            results = await asyncio.to_thread(
+                self.collection.query,
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                include=["documents", "metadatas", "distances"]
+            )
+        except Exception as e:
+            log.error("Error retrieving data for %s queries: %s", len(missing), e)
+            return [chunks or [] for chunks in retrieved]
+        
+        for row, i in enumerate(missing):
+            retrieved[i] = self._format_results(results, row) if results["documents"] else []
+            if retrieved[i]:
+                self.cache.set(cache_keys[i], retrieved[i])
+        log.debug("Retrieved chunks for %s queries (%s cached)", len(queries), len(queries) - len(missing))
+        return retrieved
+
+    @staticmethod
+    def _retrieval_key(query: str, n_results: int) -> str:
+        # Different result counts must not share an entry
+        return f"{n_results}|{normalize_query(query)}"
+
+    @staticmethod
+    def _format_results(results: Dict[str, Any], row: int) -> List[Dict[str, Any]]:
+        """Chunks with metadata for one query of a collection.query result"""
+        return [
+            {
+                "content": doc,
+                "metadata": results["metadatas"][row][i] if results["metadatas"] else {},
+                "relevance_score": results["distances"][row][i] if results["distances"] else None
+            }
+            for i, doc in enumerate(results["documents"][row])
+        ]
+
     async def generate_response(self, query: str, context_chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Generate a response based on the query and retrieved context chunks
         """
-        # Generate cache key
-        query_hash = hashlib.md5(query.encode()).hexdigest()
-        cached_response = self.response_cache.get(query_hash)
-        if cached_response:
-            if DEBUG:
-                print(f"[DEBUG] Using cached response for query: {query}")
-            return cached_response
-            
-        # Format context for the prompt
-        formatted_context = ""
-        sources = []
-        chunks = ""
-        print(f"[INFO] context_chunks: {len(context_chunks)}")
-        for i, chunk in enumerate(context_chunks):
-            chunks += str(chunk["metadata"]["chunk_index"]) + ", "
-            
-            formatted_context += f"[CHUNK {i+1}] {chunk['content']}\n\n"
-            if "metadata" in chunk and "source" in chunk["metadata"]:
-                source_file = os.path.basename(chunk["metadata"]["source"])
-                if source_file not in sources:
-                    sources.append(source_file)
+        # Format context for the prompt. Chunks go in document order, so any query that
+        # retrieves the same chunks sends a byte-identical prefix the provider can cache.
+        log.info("context_chunks: %s", len(context_chunks))
+        ordered_chunks = sorted(
+            context_chunks,
+            key=lambda chunk: (chunk["metadata"].get("source", ""), chunk["metadata"].get("chunk_index", 0))
+        )
+        formatted_context = "".join(
+            f"[CHUNK {i+1}] {chunk['content']}\n\n" for i, chunk in enumerate(ordered_chunks)
+        )
+        chunks = "".join(f"{chunk['metadata']['chunk_index']}, " for chunk in context_chunks)
+        # Chroma returns metadata as dicts already; dedupe file names in retrieval order
+        sources = list(dict.fromkeys(
+            chunk["metadata"].get("file_name") or os.path.basename(chunk["metadata"]["source"])
+            for chunk in context_chunks
+            if "source" in chunk["metadata"]
+        ))
                     
         if not formatted_context:
-            formatted_context = "No relevant information found in the project documents."
-        print(f"[INFO] formatted_context: {formatted_context}")
-        # Create prompt for the LLM
-        system_prompt = (
-            "You are an AI assistant specialized in analyzing grant applications and project documents. "
-            "You will be provided with context chunks from a project's documents. "
-            "Use this information to answer the query accurately and concisely. "
-            "If the information is not in the context, state that clearly. "
-            "Include specific facts, figures, and quotes from the documents when relevant. "
-            "Always cite your sources when quoting from specific documents."
-        )
-        
+            formatted_context = "No relevant information found in the project documents.\n\n"
+        log.debug("formatted_context: %s", formatted_context)
+        # Create prompt for the LLM; the query goes last so it doesn't break the cached prefix
         user_prompt = (
-            f"Query: {query}\n\n"
             f"Context from project documents:\n{formatted_context}"
+            f"Query: {query}"
         )
         
+        # Cache on the exact LLM input, so new context yields a fresh answer
+        cache_key = "|".join([self.llm_model_name, "0.3", RESPONSE_SYSTEM_PROMPT, user_prompt])
+        cached_response = self.response_cache.get(cache_key)
+        if cached_response:
+            log.debug("Using cached response for query: %s", query)
+            return cached_response
+        
         try:
             # Call the LLM
-            response = self.client.chat.completions.create(
+            response = await chat_completion(
+                self.client,
                 model=self.llm_model_name,
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": RESPONSE_SYSTEM_PROMPT},
                     {"role": "user", "content": user_prompt}
                 ],
-                temperature=0.3
+                temperature=0.3,
+                # Route this project's requests to the same prompt cache
+                extra_body={"prompt_cache_key": self.collection.name}
             )
             
             # Extract and cache the response
@@ -488,11 +1801,11 @@ class ProjectRAG:
                 "chunks": chunks
             }
             
-            self.response_cache.set(query_hash, result)
+            self.response_cache.set(cache_key, result)
             return result 
             
         except Exception as e:
-            print(f"[ERROR] Failed to generate response: {e}")
+            log.error("Failed to generate response: %s", e)
             return {
                 "answer": f"Error generating response: {str(e)}",
                 "sources": [],
@@ -500,19 +1813,53 @@ class ProjectRAG:
                 "error": str(e)
             }
 
-    async def ask(self, query: str) -> Dict[str, Any]:
+    async def ask(self, query: str, use_semantic_cache: bool = False) -> Dict[str, Any]:
         """
         Main method to ask a question about the project
+        
+        Args:
+            query: Question to answer from the project documents
+            use_semantic_cache: Reuse the answer to an earlier paraphrase of the question.
+                Only meant for free-form questions; templated prompts that differ in a
+                single criterion embed too closely to tell apart.
         """
-        print(f"[INFO] Processing query for {self.project_name}: {query}")
+        log.info("Processing query for %s: %s", self.project_name, query)
         
-        # 1. Retrieve relevant chunks
-        retrieved_chunks = await self.query_collection(query, n_results=5)
+        # 1. A repeated question has its chunks (and usually its answer) cached
+        # under the exact query, so it needs no embedding
+        query_embedding = None
+        retrieved_chunks = self.cache.get(self._retrieval_key(query, 5))
+        if not retrieved_chunks:
+            # 2. Reuse the answer to an earlier paraphrase of the question
+            query_embedding = (await self.embedder.embed([query]))[0]
+            if use_semantic_cache:
+                cached_response = self.semantic_cache.get(query_embedding)
+                if cached_response:
+                    log.debug("Using semantically cached response for query: %s", query)
+                    return cached_response
+            
+            # 3. Retrieve relevant chunks
+            retrieved_chunks = await self.query_collection(query, n_results=5, query_embedding=query_embedding)
     
         response = await self.generate_response(query, retrieved_chunks)
+        if use_semantic_cache and query_embedding is not None and "error" not in response:
+            self.semantic_cache.set(query_embedding, response)
         
         return response
 
+    async def ask_many(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Answer several questions about the project, retrieving their chunks in one batch
+        
+        Returns:
+            The response to each query, in the order given
+        """
+        retrieved = await self.query_collection_batch(queries, n_results=5)
+        return await gather_limited(
+            (self.generate_response(query, chunks) for query, chunks in zip(queries, retrieved)),
+            self.llm_concurrency
+        )
+
     # ------------------ REPORT GENERATION METHODS ------------------
     async def check_eligibility(self, criteria: Dict[str, str]) -> Dict[str, Any]:
         """
@@ -532,18 +1879,17 @@ class ProjectRAG:
             "summary": ""
         }
         
-        for criterion_name, question in criteria.items():
-            print(f"[INFO] Checking criterion '{criterion_name}' for {self.project_name}")
-            
+        # Ask about every criterion concurrently
+        for criterion_name in criteria:
+            log.info("Checking criterion '%s' for %s", criterion_name, self.project_name)
+        responses = await self.ask_many([
             # Format the question to explicitly ask about eligibility
-            eligibility_question = (
-                f"Based on the project documents, {question} "
-                f"Answer with 'Yes' or 'No' first, then provide supporting evidence."
-            )
-            
-            # Get answer from the RAG system
-            response = await self.ask(eligibility_question)
-            
+            f"Based on the project documents, {question} "
+            f"Answer with 'Yes' or 'No' first, then provide supporting evidence."
+            for question in criteria.values()
+        ])
+        
+        for (criterion_name, question), response in zip(criteria.items(), responses):
             # Determine eligibility by checking if the answer starts with "Yes"
             answer = response["answer"].strip()
             is_eligible = answer.lower().startswith("yes")
@@ -592,42 +1938,41 @@ class ProjectRAG:
             "summary": ""
         }
 
-        for criterion_name, question in criteria.items():
-            print(f"[INFO] Checking criterion '{criterion_name}' for {self.project_name}")
-
+        # Ask about every criterion concurrently
+        for criterion_name in criteria:
+            log.info("Checking criterion '%s' for %s", criterion_name, self.project_name)
+        responses = await self.ask_many([
             # Format selection question
-            selection_question = (
-                f"Based on the project documents, {question} "
-                f"Answer with 'Yes' or 'No' first, then provide supporting evidence."
-            )
+            f"Based on the project documents, {question} "
+            f"Answer with 'Yes' or 'No' first, then provide supporting evidence."
+            for question in criteria.values()
+        ])
+        answers = [response["answer"].strip() for response in responses]
+        selected = [answer.lower().startswith("yes") for answer in answers]
 
-            response = await self.ask(selection_question)
-            answer = response["answer"].strip()
-            is_selected = answer.lower().startswith("yes")
-
-            # If any criterion fails, the project is not selected
-            if not is_selected:
-                results["selected"] = False
+        # If any criterion fails, the project is not selected
+        if not all(selected):
+            results["selected"] = False
 
-            # Get action needed if the criterion is not met
-            if not is_selected:
-                action_prompt = (
-                    f"The project does not meet the following criterion: '{question}'. "
-                    f"What specific actions should be taken to meet this requirement?"
-                )
-                action_response = await self.ask(action_prompt)
-                action_needed = action_response["answer"].strip()
-            else:
-                action_needed = "No action needed."
+        # Get the actions needed for every criterion that is not met, also concurrently
+        questions = list(criteria.values())
+        failed = [i for i, is_selected in enumerate(selected) if not is_selected]
+        action_responses = await self.ask_many([
+            f"The project does not meet the following criterion: '{questions[i]}'. "
+            f"What specific actions should be taken to meet this requirement?"
+            for i in failed
+        ])
+        actions_needed = {i: action_response["answer"].strip() for i, action_response in zip(failed, action_responses)}
 
+        for i, (criterion_name, question) in enumerate(criteria.items()):
             # Add full criterion result
             results["criteria"].append({
                 "name": criterion_name,
                 "question": question,
-                "answer": answer,
-                "meets_criterion": is_selected,
-                "sources": response.get("sources", []),
-                "action_needed": action_needed
+                "answer": answers[i],
+                "meets_criterion": selected[i],
+                "sources": responses[i].get("sources", []),
+                "action_needed": actions_needed.get(i, "No action needed.")
             })
 
         # Summary
@@ -658,11 +2003,12 @@ class ProjectRAG:
             "sections": []
         }
         
+        # Answer every question concurrently
         for question in questions:
-            print(f"[INFO] Answering report question for {self.project_name}: {question}")
-            
-            response = await self.ask(question)
+            log.info("Answering report question for %s: %s", self.project_name, question)
+        responses = await self.ask_many(questions)
             
+        for question, response in zip(questions, responses):
             report["sections"].append({
                 "question": question,
                 "answer": response["answer"],
@@ -683,52 +2029,33 @@ class ProjectRAG:
             Dictionary with recommendation details
         """
         # Prepare context about the project for the LLM
-        context = f"Project Name: {self.project_name}\n\n"
+        context_parts = [f"Project Name: {self.project_name}\n\n"]
         
         # Add eligibility information
-        context += "ELIGIBILITY ASSESSMENT:\n"
-        context += f"Overall Eligibility: {eligibility_result['eligible']}\n"
+        context_parts.append("ELIGIBILITY ASSESSMENT:\n")
+        context_parts.append(f"Overall Eligibility: {eligibility_result['eligible']}\n")
         for criterion in eligibility_result["criteria"]:
-            context += f"- {criterion['name']}: {'Meets criterion' if criterion['meets_criterion'] else 'Does not meet criterion'}\n"
-            context += f"  Question: {criterion['question']}\n"
-            context += f"  Answer: {criterion['answer']}\n\n"
+            context_parts.append(f"- {criterion['name']}: {'Meets criterion' if criterion['meets_criterion'] else 'Does not meet criterion'}\n")
+            context_parts.append(f"  Question: {criterion['question']}\n")
+            context_parts.append(f"  Answer: {criterion['answer']}\n\n")
             
         # Add report information
-        context += "DETAILED REPORT:\n"
+        context_parts.append("DETAILED REPORT:\n")
         for section in detailed_report["sections"]:
-            context += f"Question: {section['question']}\n"
-            context += f"Answer: {section['answer']}\n\n"
+            context_parts.append(f"Question: {section['question']}\n")
+            context_parts.append(f"Answer: {section['answer']}\n\n")
+        context = "".join(context_parts)
             
         # Prepare prompt for recommendation generation
-        system_prompt = (
-            "You are a grant evaluation expert assisting a donor in making funding decisions. "
-            "Your role is to provide an objective recommendation based on project eligibility and "
-            "detailed assessment, highlighting strengths, weaknesses, risks, and potential impact. "
-            "Your recommendation should be clear, substantiated with evidence from the project documents, "
-            "and include specific funding suggestions or alternatives if appropriate. "
-            "You MUST start your response with one of these exact phrases on the first line:\n"
-            "DECISION: Fund\n"
-            "DECISION: Do Not Fund\n"
-            "DECISION: Partially Fund\n"
-        )
-        
-        user_prompt = (
-            "Based on the following project assessment, provide a donor recommendation that includes:\n"
-            "1. Funding decision (Must start with DECISION: followed by Fund/Do Not Fund/Partially Fund)\n"
-            "2. Executive summary (2-3 sentences)\n"
-            "3. Key strengths and weaknesses\n"
-            "4. Risks and mitigations\n"
-            "5. Expected impact if funded\n"
-            "6. Any conditions or special considerations\n\n"
-            f"{context}"
-        )
+        user_prompt = RECOMMENDATION_PROMPT_PREFIX + context
         
         try:
             # Generate recommendation using OpenAI
-            response = self.client.chat.completions.create(
+            response = await chat_completion(
+                self.client,
                 model=self.llm_model_name,
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": RECOMMENDATION_SYSTEM_PROMPT},
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.2
@@ -737,12 +2064,13 @@ class ProjectRAG:
             recommendation_text = response.choices[0].message.content
             
             # Extract the funding decision from the first line
-            first_line = recommendation_text.split('\n')[0].strip()
+            parts = recommendation_text.split('\n', 1)
+            first_line = parts[0].strip()
             funding_decision = "Pending"
             if first_line.startswith("DECISION:"):
-                funding_decision = first_line.replace("DECISION:", "").strip()
+                funding_decision = first_line[len("DECISION:"):].strip()
                 # Remove the decision line from the recommendation text
-                recommendation_text = '\n'.join(recommendation_text.split('\n')[1:]).strip()
+                recommendation_text = parts[1].strip() if len(parts) > 1 else ""
             
             recommendation = {
                 "project_name": self.project_name,
@@ -754,7 +2082,7 @@ class ProjectRAG:
             return recommendation
             
         except Exception as e:
-            print(f"[ERROR] Failed to generate recommendation: {e}")
+            log.error("Failed to generate recommendation: %s", e)
             return {
                 "project_name": self.project_name,
                 "timestamp": datetime.now().isoformat(),
@@ -762,6 +2090,113 @@ class ProjectRAG:
                 "recommendation": "Error generating recommendation."
             }
 
+# =================== PROJECT REGISTRY ===================
+class ProjectRegistry(MutableMapping):
+    def __init__(self, factory: Callable[[str, str], ProjectRAG],
+                 on_remove: Optional[Callable[[], None]] = None):
+        """
+        Map of project name -> ProjectRAG that opens each project on first access
+        
+        Opening a project connects to its Chroma store and loads its ingestion
+        metadata, so projects that are listed but never used cost nothing. That
+        work blocks, so async code opens projects with open/open_many, which run
+        it on a worker thread instead of the event loop.
+        
+        Args:
+            factory: Builds a ProjectRAG from a project name and folder path
+            on_remove: Called after a project is removed
+        """
+        self._factory = factory
+        self._on_remove = on_remove
+        self._paths: Dict[str, str] = {}  # Every known project, opened or not
+        self._projects: Dict[str, ProjectRAG] = {}  # Projects opened so far
+        self._saved_stats: Dict[str, Dict[str, Any]] = {}  # Stats to apply when a project is opened
+        self._opening: Dict[str, asyncio.Future] = {}  # Opens in progress on worker threads
+
+    def register(self, project_name: str, project_path: str):
+        """Add a project without opening it"""
+        self._paths[project_name] = project_path
+
+    def __getitem__(self, project_name: str) -> ProjectRAG:
+        project = self._projects.get(project_name)
+        if project is None:
+            if project_name not in self._paths:
+                raise KeyError(project_name)
+            project = self._add_opened(project_name, self._factory(project_name, self._paths[project_name]))
+        return project
+
+    async def open(self, project_name: str) -> ProjectRAG:
+        """Get a project, opening it on a worker thread; concurrent callers share one open"""
+        project = self._projects.get(project_name)
+        if project is not None:
+            return project
+        if project_name not in self._paths:
+            raise KeyError(project_name)
+        opening = self._opening.get(project_name)
+        if opening is None:
+            opening = asyncio.ensure_future(
+                asyncio.to_thread(self._factory, project_name, self._paths[project_name])
+            )
+            self._opening[project_name] = opening
+            opening.add_done_callback(lambda _: self._opening.pop(project_name, None))
+        # Shielded so one cancelled caller doesn't abort the open for the others
+        return self._add_opened(project_name, await asyncio.shield(opening))
+
+    async def open_many(self, project_names: List[str]) -> List[ProjectRAG]:
+        """Get several projects, opening the unopened ones concurrently on worker threads"""
+        return await asyncio.gather(*(self.open(project_name) for project_name in project_names))
+
+    def _add_opened(self, project_name: str, project: ProjectRAG) -> ProjectRAG:
+        """Keep a newly opened project, unless another open of it finished first"""
+        if project_name in self._projects:
+            return self._projects[project_name]
+        if project_name in self._saved_stats:
+            project.stats = self._saved_stats.pop(project_name)
+        self._projects[project_name] = project
+        return project
+
+    def __setitem__(self, project_name: str, project: ProjectRAG):
+        self._paths[project_name] = project.project_path
+        self._projects[project_name] = project
+
+    def __delitem__(self, project_name: str):
+        del self._paths[project_name]
+        self._projects.pop(project_name, None)
+        self._saved_stats.pop(project_name, None)
+        if self._on_remove is not None:
+            self._on_remove()
+
+    def __contains__(self, project_name: object) -> bool:
+        return project_name in self._paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def subset(self, project_names: Iterable[str]) -> "ProjectRegistry":
+        """Registry of just the given known projects, sharing those already opened"""
+        registry = ProjectRegistry(self._factory, self._on_remove)
+        registry._paths = {name: self._paths[name] for name in project_names if name in self._paths}
+        registry._projects = {name: self._projects[name] for name in registry._paths if name in self._projects}
+        registry._saved_stats = {name: self._saved_stats[name] for name in registry._paths if name in self._saved_stats}
+        return registry
+
+    def restore_stats(self, saved_stats: Dict[str, Dict[str, Any]]):
+        """Apply saved stats to known projects, deferring unopened ones until they are opened"""
+        for project_name, stats in saved_stats.items():
+            if project_name in self._projects:
+                self._projects[project_name].stats = stats
+            elif project_name in self._paths:
+                self._saved_stats[project_name] = stats
+
+    def all_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Stats of every project that has any, without opening the rest"""
+        stats = dict(self._saved_stats)
+        stats.update((project_name, project.stats) for project_name, project in self._projects.items())
+        return stats
+
 # =================== GRANT ASSESSMENT SYSTEM ===================
 class GrantAssessmentSystem:
     def __init__(self, projects_dir: str):
@@ -772,10 +2207,23 @@ class GrantAssessmentSystem:
             projects_dir: Directory containing project folders
         """
         self.projects_dir = projects_dir
-        self.projects = {}  # Map of project_name -> ProjectRAG
+        self.search_cache = SemanticCache(threshold=SEARCH_CACHE_THRESHOLD)  # Cross-project search results
+        # Map of project_name -> ProjectRAG; cached searches may include a removed project
+        self.projects = ProjectRegistry(self._open_project, on_remove=self.search_cache.clear)
         self.openai_key = openai_key
-        self.client = OpenAI(api_key=self.openai_key)
+        self.client = AsyncOpenAI(api_key=self.openai_key, http_client=get_async_http_client(), max_retries=0)
+        self.embedder = EmbeddingBatcher(self.client, cache=EmbeddingCache())
+        self.cpu_pool = get_cpu_pool()
         self.llm_model_name = os.getenv('LLM_MODEL', DEFAULT_LLM_MODEL)
+        self.llm_concurrency = int(os.getenv('LLM_CONCURRENCY', DEFAULT_LLM_CONCURRENCY))
+        # Every project ingests INGEST_CONCURRENCY files on the shared process pool,
+        # so projects get their own, smaller limit rather than the LLM one
+        self.project_ingest_concurrency = int(
+            os.getenv('PROJECT_INGEST_CONCURRENCY', DEFAULT_PROJECT_INGEST_CONCURRENCY)
+        )
+        self.file_counts: Dict[str, int] = {}  # Files copied or extracted per project added this session
+        # Ingestion metrics for this session's UI: (event, project name, data) tuples
+        self.metrics_queue: "queue.Queue[Tuple[str, str, Dict[str, Any]]]" = queue.Queue()
         
         # Create projects directory if it doesn't exist
         os.makedirs(projects_dir, exist_ok=True)
@@ -785,23 +2233,37 @@ class GrantAssessmentSystem:
         try:
             # Scan projects directory
             if not os.path.exists(self.projects_dir):
-                print(f"[INFO] Creating projects directory: {self.projects_dir}")
+                log.info("Creating projects directory: %s", self.projects_dir)
                 os.makedirs(self.projects_dir)
                 return
 
-            # Initialize ProjectRAG for each project folder
-            for item in os.listdir(self.projects_dir):
-                project_path = os.path.join(self.projects_dir, item)
-                if os.path.isdir(project_path):
-                    print(f"[INFO] Initializing project: {item}")
-                    self.projects[item] = ProjectRAG(item, project_path)
+            # Scan for project folders off the event loop
+            entries = await asyncio.to_thread(
+                lambda: [(entry.name, entry.path) for entry in os.scandir(self.projects_dir) if entry.is_dir()]
+            )
+            
+            # Register each project folder; its ProjectRAG is opened on first use
+            for name, path in entries:
+                self.projects.register(name, path)
 
-            print(f"[INFO] Initialized {len(self.projects)} projects")
+            log.info("Initialized %s projects", len(self.projects))
             
         except Exception as e:
-            print(f"[ERROR] Failed to initialize projects: {e}")
+            log.error("Failed to initialize projects: %s", e)
             raise
 
+    def _open_project(self, project_name: str, project_path: str) -> ProjectRAG:
+        log.info("Initializing project: %s", project_name)
+        return ProjectRAG(
+            project_name, project_path, embedder=self.embedder, cpu_pool=self.cpu_pool, client=self.client,
+            # Cached searches may include chunks of a dropped collection
+            on_reset=self.search_cache.clear
+        )
+
+    async def _gather_limited(self, coros) -> List[Any]:
+        """Run coroutines at most llm_concurrency at a time, returning errors in place of results"""
+        return await gather_limited(coros, self.llm_concurrency, return_exceptions=True)
+
     async def ingest_project(self, project_name: str) -> bool:
         """
         Ingest all documents for a specific project
@@ -813,12 +2275,13 @@ class GrantAssessmentSystem:
             bool: True if successful, False otherwise
         """
         if project_name not in self.projects:
-            print(f"[ERROR] Project not found: {project_name}")
+            log.error("Project not found: %s", project_name)
             return False
             
         try:
+            project = await self.projects.open(project_name)
             # Reset project stats before ingestion
-            self.projects[project_name].stats = {
+            project.stats = {
                 "documents_processed": 0,
                 "chunks_stored": 0,
                 "last_update": None
@@ -826,44 +2289,41 @@ class GrantAssessmentSystem:
             
             # Start ingestion
             start_time = time.time()
-            results = await self.projects[project_name].ingest_directory()
+            cache_before = project.embedder.cache_stats()
+            results = await project.ingest_directory()
+            if results.get("processed_files") or results.get("removed_files"):
+                self.search_cache.clear()
+            cache_after = project.embedder.cache_stats()
             
             # Update project stats
-            project = self.projects[project_name]
             project.stats["last_update"] = datetime.now().isoformat()
             
             # Calculate processing metrics
             elapsed_time = time.time() - start_time
             avg_time_per_doc = elapsed_time / max(1, project.stats["documents_processed"])
             
-            # Store metrics in session state if available
-            try:
-                import streamlit as st
-                if "processing_metrics" in st.session_state:
-                    st.session_state.processing_metrics[project_name] = {
-                        "Documents Processed": project.stats["documents_processed"],
-                        "Chunks Stored": project.stats["chunks_stored"],
-                        "Processing Time": f"{elapsed_time:.1f}s",
-                        "Average Time per Document": f"{avg_time_per_doc:.2f}s"
-                    }
-                if "operation_timestamps" in st.session_state:
-                    if project_name not in st.session_state.operation_timestamps:
-                        st.session_state.operation_timestamps[project_name] = {}
-                    st.session_state.operation_timestamps[project_name]["Last Ingestion"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                if "ingested_projects" in st.session_state:
-                    st.session_state.ingested_projects.add(project_name)
-            except:
-                pass  # Streamlit context may not be available
+            # Publish metrics for the UI to pick up on its next rerun
+            self.metrics_queue.put(("metrics", project_name, {
+                "Documents Processed": project.stats["documents_processed"],
+                "Chunks Stored": project.stats["chunks_stored"],
+                "Processing Time": f"{elapsed_time:.1f}s",
+                "Average Time per Document": f"{avg_time_per_doc:.2f}s",
+                "Embedding Cache Hits": cache_after["hits"] - cache_before["hits"],
+                "Embedding Cache Misses": cache_after["misses"] - cache_before["misses"]
+            }))
+            self.metrics_queue.put(("ingested", project_name, {
+                "Last Ingestion": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }))
                 
-            print(f"[INFO] Successfully ingested project {project_name}")
-            print(f"[INFO] Documents processed: {project.stats['documents_processed']}")
-            print(f"[INFO] Chunks stored: {project.stats['chunks_stored']}")
-            print(f"[INFO] Processing time: {elapsed_time:.1f}s")
+            log.info("Successfully ingested project %s", project_name)
+            log.info("Documents processed: %s", project.stats['documents_processed'])
+            log.info("Chunks stored: %s", project.stats['chunks_stored'])
+            log.info("Processing time: %.1fs", elapsed_time)
             
             return True
             
         except Exception as e:
-            print(f"[ERROR] Failed to ingest project {project_name}: {e}")
+            log.error("Failed to ingest project %s: %s", project_name, e)
             return False
 
     async def ingest_all_projects(self) -> Dict[str, Any]:
@@ -873,13 +2333,154 @@ class GrantAssessmentSystem:
         Returns:
             Dictionary with ingestion results for each project
         """
+        project_names = list(self.projects.keys())
+        log.info("Ingesting projects: %s", ", ".join(project_names))
+        outcomes = await gather_limited(
+            (self.ingest_project(project_name) for project_name in project_names),
+            self.project_ingest_concurrency,
+            return_exceptions=True
+        )
+        
         results = {}
-        for project_name in self.projects:
-            print(f"[INFO] Ingesting project: {project_name}")
-            success = await self.ingest_project(project_name)
+        for project_name, success in zip(project_names, outcomes):
+            if isinstance(success, Exception):
+                log.error("Failed to ingest project %s: %s", project_name, success)
+                success = False
             results[project_name] = {"success": success}
         return results
 
+    async def check_all_projects_eligibility(self, criteria: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Check eligibility of all projects concurrently
+        
+        Args:
+            criteria: Dictionary mapping criteria names to questions
+            
+        Returns:
+            Dictionary mapping project names to eligibility results
+        """
+        project_names = list(self.projects.keys())
+        projects = await self.projects.open_many(project_names)
+        results = await self._gather_limited(project.check_eligibility(criteria) for project in projects)
+        
+        eligibility_results = {}
+        for project_name, result in zip(project_names, results):
+            if isinstance(result, Exception):
+                log.error("Eligibility check failed for %s: %s", project_name, result)
+                continue
+            eligibility_results[project_name] = result
+        return eligibility_results
+
+    async def generate_all_detailed_reports(self, questions: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate detailed reports for all projects concurrently
+        
+        Args:
+            questions: List of questions to answer about each project
+            
+        Returns:
+            Dictionary mapping project names to detailed reports
+        """
+        project_names = list(self.projects.keys())
+        projects = await self.projects.open_many(project_names)
+        results = await self._gather_limited(project.generate_detailed_report(questions) for project in projects)
+        
+        reports = {}
+        for project_name, result in zip(project_names, results):
+            if isinstance(result, Exception):
+                log.error("Report generation failed for %s: %s", project_name, result)
+                continue
+            reports[project_name] = result
+        return reports
+
+    async def generate_all_recommendations(
+        self,
+        eligibility_results: Dict[str, Dict[str, Any]],
+        detailed_reports: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate donor recommendations for all projects concurrently
+        
+        Args:
+            eligibility_results: Results from check_all_projects_eligibility
+            detailed_reports: Results from generate_all_detailed_reports
+            
+        Returns:
+            Dictionary mapping project names to recommendations
+        """
+        # Only projects with both inputs available can be assessed
+        project_names = [
+            project_name for project_name in self.projects
+            if project_name in eligibility_results and project_name in detailed_reports
+        ]
+        projects = await self.projects.open_many(project_names)
+        results = await self._gather_limited(
+            project.generate_recommendation(eligibility_results[project_name], detailed_reports[project_name])
+            for project_name, project in zip(project_names, projects)
+        )
+        
+        recommendations = {}
+        for project_name, result in zip(project_names, results):
+            if isinstance(result, Exception):
+                log.error("Recommendation failed for %s: %s", project_name, result)
+                continue
+            recommendations[project_name] = result
+        return recommendations
+
+    async def assess_project(self, project_name: str, criteria: Dict[str, str], questions: List[str],
+                             ingest: bool = False) -> Dict[str, Any]:
+        """
+        Run one project's assessment: eligibility check and detailed report together,
+        then the recommendation built from both
+        
+        Args:
+            project_name: Name of the project to assess
+            criteria: Dictionary mapping criteria names to questions
+            questions: List of questions for the detailed report
+            ingest: Ingest the project's documents first
+            
+        Returns:
+            Dictionary with the project's eligibility, report and recommendation
+        """
+        if ingest:
+            await self.ingest_project(project_name)
+        project = await self.projects.open(project_name)
+        eligibility, report = await asyncio.gather(
+            project.check_eligibility(criteria),
+            project.generate_detailed_report(questions)
+        )
+        recommendation = await project.generate_recommendation(eligibility, report)
+        return {"eligibility": eligibility, "report": report, "recommendation": recommendation}
+
+    async def assess_all_projects(self, criteria: Dict[str, str], questions: List[str],
+                                  ingest: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Assess all projects concurrently
+        
+        Each project moves on to its next stage as soon as its own inputs are
+        ready, instead of waiting for every project to finish the current stage.
+        
+        Args:
+            criteria: Dictionary mapping criteria names to questions
+            questions: List of questions for the detailed reports
+            ingest: Ingest each project's documents before assessing it
+            
+        Returns:
+            Dictionary mapping project names to assessment results
+        """
+        project_names = list(self.projects.keys())
+        results = await self._gather_limited(
+            self.assess_project(project_name, criteria, questions, ingest=ingest) for project_name in project_names
+        )
+        
+        assessments = {}
+        for project_name, result in zip(project_names, results):
+            if isinstance(result, Exception):
+                log.error("Assessment failed for %s: %s", project_name, result)
+                continue
+            assessments[project_name] = result
+        return assessments
+
     async def add_project_folder(self, folder_path: str) -> bool:
         """
         Add a new project folder to the system
@@ -892,43 +2493,132 @@ class GrantAssessmentSystem:
         """
         try:
             if not os.path.isdir(folder_path):
-                print(f"[ERROR] Not a valid directory: {folder_path}")
+                log.error("Not a valid directory: %s", folder_path)
                 return False
                 
             project_name = os.path.basename(folder_path)
             if project_name in self.projects:
-                print(f"[WARN] Project {project_name} already exists")
+                log.warning("Project %s already exists", project_name)
                 return False
                 
             # Copy folder to projects directory
             target_path = os.path.join(self.projects_dir, project_name)
             if os.path.exists(target_path):
-                print(f"[WARN] Target path already exists: {target_path}")
+                log.warning("Target path already exists: %s", target_path)
                 return False
                 
-            # Create target directory and copy files
-            os.makedirs(target_path, exist_ok=True)
-            for root, _, files in os.walk(folder_path):
-                for file in files:
-                    src_file = os.path.join(root, file)
-                    rel_path = os.path.relpath(src_file, folder_path)
-                    dst_file = os.path.join(target_path, rel_path)
-                    os.makedirs(os.path.dirname(dst_file), exist_ok=True)
-                    import shutil
-                    shutil.copy2(src_file, dst_file)
-                    
-            # Initialize ProjectRAG for the new folder
-            self.projects[project_name] = ProjectRAG(project_name, target_path)
-            print(f"[INFO] Successfully added project: {project_name}")
+            # Copy files off the event loop
+            file_count = await asyncio.to_thread(copy_project_tree, folder_path, target_path)
+            log.info("Copied %s files to %s", file_count, target_path)
+            self.file_counts[project_name] = file_count
             
-            # Ingest the new project
-            await self.ingest_project(project_name)
+            await self._register_project(project_name, target_path)
             return True
             
         except Exception as e:
-            print(f"[ERROR] Failed to add project folder: {e}")
+            log.error("Failed to add project folder: %s", e)
             return False
 
+    async def add_project_archive(self, archive: BinaryIO, project_name: str) -> bool:
+        """
+        Add a new project from a ZIP archive, extracting it directly into the projects directory
+        
+        Args:
+            archive: Seekable file-like object holding the ZIP data
+            project_name: Name of the new project
+            
+        Returns:
+            bool: True if successfully added, False otherwise
+        """
+        target_path = os.path.join(self.projects_dir, project_name)
+        try:
+            if project_name in self.projects:
+                log.warning("Project %s already exists", project_name)
+                return False
+            if os.path.exists(target_path):
+                log.warning("Target path already exists: %s", target_path)
+                return False
+            
+            # Extract off the event loop
+            file_count = await asyncio.to_thread(extract_project_archive, archive, target_path)
+            log.info("Extracted %s files to %s", file_count, target_path)
+            self.file_counts[project_name] = file_count
+            
+            await self._register_project(project_name, target_path)
+            return True
+            
+        except Exception as e:
+            log.error("Failed to add project archive: %s", e)
+            if project_name not in self.projects:
+                # Don't leave a half-extracted folder behind to block a retry
+                shutil.rmtree(target_path, ignore_errors=True)
+            return False
+
+    async def _register_project(self, project_name: str, target_path: str):
+        """Initialize and ingest a ProjectRAG for a folder inside the projects directory"""
+        self.projects.register(project_name, target_path)
+        await self.projects.open(project_name)
+        log.info("Successfully added project: %s", project_name)
+        
+        # Ingest the new project
+        await self.ingest_project(project_name)
+
+    async def collect_project_responses(self, query: str, project_names: list[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Ask the same question to several projects concurrently
+        
+        Args:
+            query (str): The question to ask each project
+            project_names (list[str]): List of project names to query
+            
+        Returns:
+            dict: Project name mapped to its response (errors become error answers)
+        """
+        raw_responses = await self._gather_limited(
+            self.ask_project(project_name, query) for project_name in project_names
+        )
+
+        responses = {}
+        for project_name, project_response in zip(project_names, raw_responses):
+            if isinstance(project_response, Exception):
+                responses[project_name] = {
+                    "answer": f"Error getting response: {str(project_response)}",
+                    "sources": []
+                }
+            else:
+                responses[project_name] = project_response
+        return responses
+
+    async def stream_comparison(self, query: str, responses: Dict[str, Dict[str, Any]]) -> AsyncIterator[str]:
+        """
+        Stream the comparative analysis of project responses as it is generated
+        
+        Args:
+            query (str): The question the projects answered
+            responses (dict): Project responses from collect_project_responses
+            
+        Yields:
+            str: Pieces of the comparison text as they arrive
+        """
+        # Prepare context for comparison
+        context = "\n".join(
+            f"\n{project}:\n{response['answer']}" for project, response in responses.items()
+        )
+        
+        stream = await chat_completion(
+            self.client,
+            model=self.llm_model_name,
+            messages=[
+                {"role": "system", "content": COMPARISON_SYSTEM_PROMPT},
+                {"role": "user", "content": COMPARISON_PROMPT_TEMPLATE.format(query=query, context=context)}
+            ],
+            temperature=0.3,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+
     async def chat_with_projects(self, query: str, project_names: list[str]) -> dict:
         """
         Ask a question to multiple projects and generate a comparative analysis.
@@ -943,48 +2633,12 @@ class GrantAssessmentSystem:
         if not project_names or len(project_names) < 2:
             raise ValueError("At least 2 projects are required for multi-project chat")
         
-        # Get responses from each project
-        responses = {}
-        for project_name in project_names:
-            try:
-                project_response = await self.ask_project(project_name, query)
-                responses[project_name] = project_response
-            except Exception as e:
-                responses[project_name] = {
-                    "answer": f"Error getting response: {str(e)}",
-                    "sources": []
-                }
+        # Get responses from all projects concurrently
+        responses = await self.collect_project_responses(query, project_names)
         
         # Generate comparative analysis
         try:
-            # Prepare context for comparison
-            context = f"Question asked: {query}\n\nProject responses:\n"
-            for project, response in responses.items():
-                context += f"\n{project}:\n{response['answer']}"
-            
-            comparison_prompt = f"""Based on the responses from multiple projects to the question "{query}", please provide a comparative analysis.
-            Focus on:
-            1. Key similarities and differences in the responses
-            2. Notable insights unique to each project
-            3. Overall patterns or trends
-            4. Implications of these differences
-            
-            Context:
-            {context}
-            
-            Please provide a clear, structured analysis that helps understand how the projects relate to each other in the context of this question."""
-            
-            response = await self.client.chat.completions.create(
-                model=self.llm_model_name,
-                messages=[
-                    {"role": "system", "content": "You are an expert grant analyst tasked with comparing responses from multiple projects. Provide clear, insightful analysis that helps understand the relationships and differences between projects."},
-                    {"role": "user", "content": comparison_prompt}
-                ],
-                temperature=0.3
-            )
-            
-            comparison = response.choices[0].message.content
-            
+            comparison = "".join([piece async for piece in self.stream_comparison(query, responses)])
         except Exception as e:
             comparison = f"Error generating comparative analysis: {str(e)}"
         
@@ -993,23 +2647,71 @@ class GrantAssessmentSystem:
             "comparison": comparison
         }
 
-    async def search_projects(self, query: str) -> Dict[str, List[Dict[str, Any]]]:
+    async def search_projects(self, query: str, top_k: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
         """
         Search across all projects for relevant information
         
         Args:
             query: Search query
+            top_k: Stop once this many chunks have been collected (search all projects if None)
             
         Returns:
             Dictionary mapping project names to lists of relevant chunks
         """
         results = {}
-        for project_name, project in self.projects.items():
-            chunks = await project.query_collection(query, n_results=3)
-            if chunks:
+        found = 0
+        async with contextlib.aclosing(self.stream_search_projects(query)) as stream:
+            async for project_name, chunks in stream:
                 results[project_name] = chunks
+                found += len(chunks)
+                if top_k is not None and found >= top_k:
+                    break
                 
-        return results
+        # Report in project order regardless of completion order
+        return {name: results[name] for name in self.projects if name in results}
+
+    async def stream_search_projects(self, query: str) -> AsyncIterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Search across all projects, yielding each project's chunks as soon as its query finishes
+        
+        Args:
+            query: Search query
+            
+        Yields:
+            (project_name, chunks) for each project with results, in completion order
+        """
+        # Embed once for every project, and reuse the results of a near-identical earlier search
+        query_embedding = (await self.embedder.embed([query]))[0]
+        cached = self.search_cache.get(query_embedding)
+        if cached is not None:
+            for item in cached.items():
+                yield item
+            return
+
+        async def search(project_name: str, project: ProjectRAG):
+            return project_name, await project.query_collection(query, n_results=3, query_embedding=query_embedding)
+
+        project_names = list(self.projects.keys())
+        projects = await self.projects.open_many(project_names)
+        tasks = [
+            asyncio.create_task(search(project_name, project))
+            for project_name, project in zip(project_names, projects)
+        ]
+        
+        results = {}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                project_name, chunks = await next_done
+                if chunks:
+                    results[project_name] = chunks
+                    yield project_name, chunks
+        finally:
+            # Stopped early by the consumer
+            for task in tasks:
+                task.cancel()
+        
+        # Only a complete search is cached
+        self.search_cache.set(query_embedding, {name: results[name] for name in self.projects if name in results})
 
     async def generate_comparative_analysis(self, eligible_only: bool = True) -> Dict[str, Any]:
         """
@@ -1028,53 +2730,35 @@ class GrantAssessmentSystem:
                     "timestamp": datetime.now().isoformat()
                 }
             
+            # Query each project for key information concurrently
+            query = PROJECT_SUMMARY_QUERY
+            project_names = list(self.projects.keys())
+            projects = await self.projects.open_many(project_names)
+            answers = await self._gather_limited(project.ask(query) for project in projects)
+            
             # Prepare context about all projects
-            projects_context = ""
             responses = {}
             
-            for project_name, project in self.projects.items():
-                # Query each project for key information
-                query = (
-                    "Summarize this project's key aspects including: "
-                    "1. Main objectives and goals "
-                    "2. Target beneficiaries "
-                    "3. Implementation approach "
-                    "4. Expected outcomes and impact "
-                    "5. Budget and resource requirements"
-                )
-                
-                response = await project.ask(query)
+            for project_name, response in zip(project_names, answers):
+                if isinstance(response, Exception):
+                    response = {
+                        "answer": f"Error getting response: {str(response)}",
+                        "sources": []
+                    }
                 responses[project_name] = response
                 
-                projects_context += f"\nProject: {project_name}\n{response['answer']}\n"
-                
-            # Generate comparative analysis using GPT-4
-            system_prompt = (
-                "You are an expert grant analyst tasked with comparing multiple projects. "
-                "Provide a detailed comparative analysis focusing on strengths, weaknesses, "
-                "synergies, and potential impact. Be objective and support your analysis "
-                "with specific examples from the projects."
-            )
-            
-            user_prompt = (
-                "Compare the following projects, analyzing their relative merits, "
-                "potential impact, and areas of complementarity or overlap:\n\n"
-                f"{projects_context}\n\n"
-                "Please structure your analysis to cover:\n"
-                "1. Key similarities and differences\n"
-                "2. Relative strengths and weaknesses\n"
-                "3. Potential synergies or overlaps\n"
-                "4. Comparative impact assessment\n"
-                "5. Resource efficiency comparison\n"
-                "6. Recommendations for optimization"
+            projects_context = "".join(
+                f"\nProject: {project_name}\n{response['answer']}\n"
+                for project_name, response in responses.items()
             )
             
             # Generate comparative analysis
-            analysis_response = self.client.chat.completions.create(
+            analysis_response = await chat_completion(
+                self.client,
                 model=self.llm_model_name,
                 messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
+                    {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+                    {"role": "user", "content": ANALYSIS_PROMPT_TEMPLATE.format(context=projects_context)}
                 ],
                 temperature=0.3
             )
@@ -1087,7 +2771,7 @@ class GrantAssessmentSystem:
             }
             
         except Exception as e:
-            print(f"[ERROR] Failed to generate comparative analysis: {e}")
+            log.error("Failed to generate comparative analysis: %s", e)
             return {
                 "error": str(e),
                 "timestamp": datetime.now().isoformat()
@@ -1113,10 +2797,11 @@ class GrantAssessmentSystem:
             }
             
         try:
-            response = await self.projects[project_name].ask(question)
+            project = await self.projects.open(project_name)
+            response = await project.ask(question, use_semantic_cache=True)
             return response
         except Exception as e:
-            print(f"[ERROR] Failed to query project {project_name}: {e}")
+            log.error("Failed to query project %s: %s", project_name, e)
             return {
                 "error": str(e),
                 "answer": f"Error querying project: {str(e)}",
@@ -1126,29 +2811,34 @@ class GrantAssessmentSystem:
 
 # =================== MAIN FUNCTION ===================
 async def main():
+    listener = setup_logging()
+    try:
+        await run_pipeline()
+    finally:
+        # Shield the cleanup so a cancelled pipeline still closes its connections
+        await asyncio.shield(shutdown())
+        listener.stop()
+
+async def run_pipeline():
     # Setup the grant assessment system
     system = GrantAssessmentSystem("./GrantRAG/projects_data")
     await system.initialize_projects()
     
-    # Ingest all project documents
-    print("[INFO] Starting document ingestion for all projects...")
-    await system.ingest_all_projects()
-    print("[INFO] Document ingestion completed")
-    
-    # Example of checking eligibility for all projects
-    print("[INFO] Checking eligibility for all projects...")
-    eligibility_results = await system.check_all_projects_eligibility()
-    for project_name, result in eligibility_results.items():
-        print(f"Project '{project_name}' eligible: {result['eligible']}")
+    program = GRANT_PROGRAMS[os.getenv('GRANT_PROGRAM', DEFAULT_GRANT_PROGRAM)]
     
-    # Example of generating recommendations
-    print("[INFO] Generating recommendations for all projects...")
-    recommendations = await system.generate_all_recommendations()
+    # Each project is ingested, checked for eligibility alongside its detailed report,
+    # then given a recommendation, without waiting on the other projects between stages
+    log.info("Ingesting and assessing all projects...")
+    assessments = await system.assess_all_projects(
+        program["eligibility_criteria"], program["report_questions"], ingest=True
+    )
+    for project_name, assessment in assessments.items():
+        log.info("Project '%s' eligible: %s", project_name, assessment["eligibility"]["eligible"])
     
     # Example of comparative analysis
-    print("[INFO] Generating comparative analysis...")
+    log.info("Generating comparative analysis...")
     analysis = await system.generate_comparative_analysis()
-    print("[INFO] Analysis completed")
+    log.info("Analysis completed")
    
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
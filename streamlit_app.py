@@ -11,12 +11,12 @@ except ImportError:
     import sqlite3
     sys.modules['sqlite3'] = sqlite3
 
-import asyncio
 import json
 import streamlit as st
 from typing import Dict, List, Any, Optional
 import pandas as pd
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import time
 
 # Add the GrantRAG directory to the Python path
@@ -36,11 +36,13 @@ from components import (
 )
 from utils import (
     init_session_state,
-    load_session_state,
-    apply_custom_css
+    apply_queued_metrics,
+    apply_custom_css,
+    run_async,
+    iterate_async
 )
 from config.constants import GRANT_PROGRAMS
-from grant_rag import GrantAssessmentSystem
+from grant_rag import GrantAssessmentSystem, setup_logging
 
 # Configure streamlit page
 st.set_page_config(
@@ -50,7 +52,34 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-async def initialize_grant_system():
+@st.cache_resource
+def start_logging():
+    """Start the queued log listener once per server process"""
+    return setup_logging()
+
+def get_project_info(project_name: str, project_path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Count a project's files in one walk of its tree (blocking)"""
+    file_count = sum(len(files) for _, _, files in os.walk(project_path))
+    return {
+        "name": project_name,
+        "path": project_path,
+        "file_count": file_count,
+        "last_modified": datetime.fromtimestamp(mtime_ns / 1e9).strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+def scan_projects_info(projects_data_path: str) -> List[Dict[str, Any]]:
+    """Get every project folder's info, walking the folders concurrently on worker threads"""
+    # scandir entries carry their stat, so this is one call per folder
+    project_dirs = [
+        (entry.name, entry.path, entry.stat().st_mtime_ns)
+        for entry in os.scandir(projects_data_path) if entry.is_dir()
+    ]
+    if not project_dirs:
+        return []
+    with ThreadPoolExecutor(max_workers=min(32, len(project_dirs))) as pool:
+        return list(pool.map(lambda project_dir: get_project_info(*project_dir), project_dirs))
+
+def initialize_grant_system():
     """Initialize the grant system and projects"""
     if st.session_state.grant_system is None:
         with st.spinner("Initializing grant system..."):
@@ -59,45 +88,43 @@ async def initialize_grant_system():
             projects_data_path = os.path.join(current_dir, "projects_data")
             
             st.session_state.grant_system = GrantAssessmentSystem(projects_data_path)
-            await st.session_state.grant_system.initialize_projects()
+            run_async(st.session_state.grant_system.initialize_projects())
             
             # Get initial project info
             if os.path.exists(projects_data_path):
-                project_dirs = [d for d in os.listdir(projects_data_path) 
-                              if os.path.isdir(os.path.join(projects_data_path, d))]
-                for project_name in project_dirs:
-                    project_path = os.path.join(projects_data_path, project_name)
-                    file_count = sum([len(files) for _, _, files in os.walk(project_path)])
-                    
-                    st.session_state.projects_info[project_name] = {
-                        "name": project_name,
-                        "path": project_path,
-                        "file_count": file_count,
-                        "last_modified": datetime.fromtimestamp(os.path.getmtime(project_path)).strftime("%Y-%m-%d %H:%M:%S")
-                    }
+                for info in scan_projects_info(projects_data_path):
+                    st.session_state.projects_info[info["name"]] = info
             
             # Restore project stats if available
             if hasattr(st.session_state, 'saved_project_stats'):
-                for project_name, stats in st.session_state.saved_project_stats.items():
-                    if project_name in st.session_state.grant_system.projects:
-                        st.session_state.grant_system.projects[project_name].stats = stats
+                st.session_state.grant_system.projects.restore_stats(st.session_state.saved_project_stats)
                 # Clean up saved stats
                 delattr(st.session_state, 'saved_project_stats')
 
+def render_search_results(query: str) -> bool:
+    """Render each project's search results as soon as its query finishes"""
+    found = False
+    for project, results in iterate_async(st.session_state.grant_system.stream_search_projects(query)):
+        with st.expander(f"Results from {project}"):
+            st.markdown(results)
+        found = True
+    return found
+
 def main():
     """Main function to run the Streamlit app"""
-    # Initialize session state
+    start_logging()
+    
+    # Initialize session state (loads any saved session on the first run)
     init_session_state()
     
-    # Load saved session state automatically if enabled and file exists
-    if st.session_state.get("persistence_enabled", True) and os.path.exists("session_state.json"):
-        load_session_state()
+    # Pick up metrics published by background ingestion
+    apply_queued_metrics()
     
     # Apply custom CSS
     apply_custom_css()
     
     # Initialize grant system
-    asyncio.run(initialize_grant_system())
+    initialize_grant_system()
     
     # Create layout
     render_sidebar()
@@ -109,12 +136,8 @@ def main():
     st.text_input("🔍 Search across all projects", key="global_search", placeholder="Enter your search query...")
     if st.session_state.get("global_search"):
         with st.spinner("Searching..."):
-            search_results = asyncio.run(st.session_state.grant_system.search_across_projects(st.session_state.global_search))
-            if search_results:
-                for project, results in search_results.items():
-                    with st.expander(f"Results from {project}"):
-                        st.markdown(results)
-            else:
+            found = render_search_results(st.session_state.global_search)
+            if not found:
                 st.info("No results found")
     
     # Show grant program info
@@ -158,6 +181,18 @@ def main():
     with tabs[7]:
         render_settings()
 
+@st.cache_data(show_spinner=False)
+def build_comparison_df(responses: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    """Build the comparison table; cached until a new analysis is generated"""
+    return pd.DataFrame([
+        {
+            "Project": project,
+            "Response": response.get("answer", "No response"),
+            "Sources": ", ".join(response.get("sources", []))
+        }
+        for project, response in responses.items()
+    ])
+
 def render_comparative_analysis():
     """Render comparative analysis in the main area"""
     if st.session_state.comparative_analysis:
@@ -169,19 +204,10 @@ def render_comparative_analysis():
             st.error(f"Error generating comparative analysis: {analysis['error']}")
         else:
             # Create comparison table
-            if "responses" in analysis:
-                comparison_data = []
-                for project, response in analysis["responses"].items():
-                    comparison_data.append({
-                        "Project": project,
-                        "Response": response.get("answer", "No response"),
-                        "Sources": ", ".join(response.get("sources", []))
-                    })
-                
-                if comparison_data:
-                    st.markdown("### Project Responses")
-                    comparison_df = pd.DataFrame(comparison_data)
-                    st.dataframe(comparison_df, use_container_width=True)
+            if analysis.get("responses"):
+                st.markdown("### Project Responses")
+                comparison_df = build_comparison_df(analysis["responses"])
+                st.dataframe(comparison_df, use_container_width=True)
             
             st.markdown("### Analysis Summary")
             st.markdown(analysis.get("comparison", "No comparative analysis available."))
@@ -1,10 +1,15 @@
-from .session import init_session_state, save_session_state, load_session_state, clear_session_state
+from .session import init_session_state, save_session_state, load_session_state, clear_session_state, apply_queued_metrics
 from .styles import apply_custom_css
+from .event_loop import get_event_loop, run_async, iterate_async
 
 __all__ = [
     'init_session_state',
     'save_session_state',
     'load_session_state',
     'clear_session_state',
+    'apply_queued_metrics',
     'apply_custom_css',
+    'get_event_loop',
+    'run_async',
+    'iterate_async',
 ] 
\ No newline at end of file
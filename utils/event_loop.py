@@ -0,0 +1,43 @@
+import asyncio
+import threading
+import streamlit as st
+from typing import Any, AsyncIterator, Coroutine, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()  # Returned by anext() once an async generator is exhausted
+
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Start one event loop for the server process, running in a background thread
+
+    The loop outlives reruns, so the shared HTTP/2 connection pool, the
+    embedding batcher and in-flight keep-alive connections are reused between
+    actions instead of being torn down by asyncio.run every time.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="grant-rag-event-loop", daemon=True).start()
+    return loop
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine on the shared event loop and wait for its result
+
+    The coroutine runs on the loop's thread, which has no script context,
+    so it must not call Streamlit; read session state before and write it after.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+def iterate_async(agen: AsyncIterator[T]) -> Iterator[T]:
+    """Drive an async generator on the shared event loop, yielding its items to the script thread"""
+    async def step():
+        return await anext(agen, _DONE)
+
+    try:
+        while (item := run_async(step())) is not _DONE:
+            yield item
+    finally:
+        # Let the generator clean up (e.g. cancel its tasks) if the caller stopped early
+        if hasattr(agen, "aclose"):
+            run_async(agen.aclose())
@@ -1,13 +1,40 @@
 import os
-import json
+import time
+import queue
+import atexit
+import hashlib
+import sqlite3
+import threading
+import orjson
 import streamlit as st
 from datetime import datetime
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Optional
+from grant_rag import log
+
+SESSION_DB_PATH = "session_state.db"  # SQLite store, one row per session state key
+LEGACY_STATE_FILES = ("session_state.json", "project_stats.json")  # Read once if the store is empty
+PROJECT_STATS_KEY = "project_stats"  # Row holding every project's stats
+STATE_FLUSH_INTERVAL = 1.0  # Seconds between background writes of changed state
+
+# orjson options for the stored values
+STATE_DUMP_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Latest unwritten value of each key; repeated saves between flushes coalesce
+_pending_values: Dict[str, bytes] = {}
+_pending_lock = threading.Lock()
+_db_lock = threading.Lock()  # One flush (and one user of the connection) at a time
+_writer: Optional[threading.Thread] = None
+
+# Digest of the last value this process wrote for each key
+_written_digests: Dict[str, bytes] = {}
 
 def init_session_state():
     """Initialize Streamlit session state variables"""
-    # Try to load saved state first
-    if os.path.exists("session_state.json"):
+    # Try to load saved state first, once per browser session; later reruns
+    # already hold it in memory
+    if "session_loaded" not in st.session_state:
+        st.session_state.session_loaded = True
         load_session_state()
     
     # Initialize core variables if not present
@@ -58,8 +85,107 @@ def init_session_state():
     if st.session_state.persistence_enabled:
         save_session_state()
 
+def apply_queued_metrics() -> bool:
+    """Apply ingestion metrics published by this session's grant system to session state"""
+    grant_system = st.session_state.get("grant_system")
+    if grant_system is None:
+        return False
+    applied = False
+    while True:
+        try:
+            event, project_name, data = grant_system.metrics_queue.get_nowait()
+        except queue.Empty:
+            return applied
+        if event == "metrics":
+            st.session_state.processing_metrics[project_name] = data
+        elif event == "ingested":
+            st.session_state.ingested_projects.add(project_name)
+            st.session_state.operation_timestamps.setdefault(project_name, {}).update(data)
+        applied = True
+
+@lru_cache(maxsize=1)
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(SESSION_DB_PATH, check_same_thread=False, isolation_level=None)
+    # WAL lets sessions read while the writer commits; NORMAL skips an fsync per commit
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+    return conn
+
+def write_state_value(key: str, data: bytes):
+    """
+    Queue a serialized value for a state key; the background writer stores the
+    latest value of each key at most once per STATE_FLUSH_INTERVAL
+    """
+    global _writer
+    with _pending_lock:
+        _pending_values[key] = data
+        if _writer is None:
+            _writer = threading.Thread(target=_write_behind, name="session-state-writer", daemon=True)
+            _writer.start()
+
+def _write_behind():
+    while True:
+        time.sleep(STATE_FLUSH_INTERVAL)
+        flush_state()
+
+def flush_state():
+    """Write all queued values that changed since they were last written, in one transaction"""
+    with _db_lock:
+        with _pending_lock:
+            pending = dict(_pending_values)
+            _pending_values.clear()
+        digests = {key: hashlib.blake2b(data, digest_size=16).digest() for key, data in pending.items()}
+        changed = [(key, data) for key, data in pending.items() if _written_digests.get(key) != digests[key]]
+        if not changed:
+            return
+        try:
+            conn = _connect()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "INSERT INTO state (key, value) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    changed
+                )
+        except Exception as e:
+            log.error("Failed to save session state: %s", e)
+            return
+        for key, _ in changed:
+            _written_digests[key] = digests[key]
+
+def read_state() -> Dict[str, Any]:
+    """Every stored state value, including saves still queued for the writer"""
+    flush_state()
+    with _db_lock:
+        rows = _connect().execute("SELECT key, value FROM state").fetchall()
+    return {key: orjson.loads(value) for key, value in rows}
+
+def discard_state():
+    """Delete the stored state and drop any queued writes"""
+    with _db_lock:
+        with _pending_lock:
+            _pending_values.clear()
+        _written_digests.clear()
+        _connect().execute("DELETE FROM state")
+
+def _read_legacy_state() -> Dict[str, Any]:
+    """State saved by versions that wrote JSON files"""
+    state = {}
+    session_file, stats_file = LEGACY_STATE_FILES
+    if os.path.exists(session_file):
+        with open(session_file, "rb") as f:
+            state.update(orjson.loads(f.read()))
+    if os.path.exists(stats_file):
+        with open(stats_file, "rb") as f:
+            state[PROJECT_STATS_KEY] = orjson.loads(f.read())
+    return state
+
+# Persist whatever is still queued when the server shuts down
+atexit.register(flush_state)
+
 def save_session_state() -> bool:
-    """Save the current session state to a JSON file"""
+    """Save the current session state (written to the state store by the background writer)"""
     try:
         # Convert sets to lists for JSON serialization
         state_dict = {
@@ -81,18 +207,16 @@ def save_session_state() -> bool:
             "persistence_enabled": st.session_state.persistence_enabled
         }
         
-        # Save to file
-        with open("session_state.json", "w") as f:
-            json.dump(state_dict, f)
+        # Each key is its own row, so only the keys that changed are rewritten
+        for key, value in state_dict.items():
+            write_state_value(key, orjson.dumps(value, option=STATE_DUMP_OPTIONS))
             
         # Also save project-specific stats
         if st.session_state.grant_system and st.session_state.grant_system.projects:
-            project_stats = {}
-            for project_name, project_rag in st.session_state.grant_system.projects.items():
-                project_stats[project_name] = project_rag.stats
+            # Projects not opened this session keep their saved stats
+            project_stats = st.session_state.grant_system.projects.all_stats()
             
-            with open("project_stats.json", "w") as f:
-                json.dump(project_stats, f)
+            write_state_value(PROJECT_STATS_KEY, orjson.dumps(project_stats, option=STATE_DUMP_OPTIONS))
                 
         return True
     except Exception as e:
@@ -100,12 +224,11 @@ def save_session_state() -> bool:
         return False
 
 def load_session_state() -> bool:
-    """Load session state from JSON file"""
+    """Load session state from the state store"""
     try:
-        if os.path.exists("session_state.json"):
-            with open("session_state.json", "r") as f:
-                state_dict = json.load(f)
-                
+        state_dict = read_state() or _read_legacy_state()
+        project_stats = state_dict.pop(PROJECT_STATS_KEY, None)
+        if state_dict:
             # Restore session state
             st.session_state.selected_program = state_dict.get("selected_program")
             st.session_state.selected_projects = state_dict.get("selected_projects", [])
@@ -125,10 +248,7 @@ def load_session_state() -> bool:
             st.session_state.persistence_enabled = state_dict.get("persistence_enabled", True)
             
         # Load project stats if available
-        if os.path.exists("project_stats.json"):
-            with open("project_stats.json", "r") as f:
-                project_stats = json.load(f)
-                
+        if project_stats is not None:
             # Store for later use when grant system is initialized
             st.session_state.saved_project_stats = project_stats
             
@@ -139,11 +259,11 @@ def load_session_state() -> bool:
 
 def clear_session_state():
     """Clear all session state variables and reinitialize"""
-    # Remove saved state files
-    if os.path.exists("session_state.json"):
-        os.remove("session_state.json")
-    if os.path.exists("project_stats.json"):
-        os.remove("project_stats.json")
+    # Remove saved state, including saves not yet written
+    discard_state()
+    for path in LEGACY_STATE_FILES:
+        if os.path.exists(path):
+            os.remove(path)
         
     # Clear all session state
     for key in list(st.session_state.keys()):
@@ -1,8 +1,16 @@
+import re
 import streamlit as st
 
-def apply_custom_css():
-    """Apply custom CSS styling"""
-    st.markdown("""
+def _minify_css(html: str) -> str:
+    """Drop CSS comments and collapse whitespace"""
+    html = re.sub(r"/\*.*?\*/", "", html, flags=re.DOTALL)
+    html = re.sub(r"\s+", " ", html)
+    html = re.sub(r"\s*([{};,>])\s*", r"\1", html)
+    # Only after a colon: a space before one is a descendant combinator (".a :hover")
+    return re.sub(r":\s+", ":", html).strip()
+
+# Built once per process; Streamlit still needs it on every rerun to keep the page styled
+CUSTOM_CSS = _minify_css("""
         <style>
             /* Consulti branding */
             .consulti-brand {
@@ -135,4 +143,8 @@ def apply_custom_css():
                 padding: 20px 0;
             }
         </style>
-    """, unsafe_allow_html=True) 
\ No newline at end of file
+""")
+
+def apply_custom_css():
+    """Apply custom CSS styling"""
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)